@@ -0,0 +1,12 @@
+"""
+Gunicorn server hooks for Atlas API.
+
+Loaded by scripts/start-production.sh via --config.
+"""
+
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker) -> None:
+    """Drop a dead worker's live gauge files so livesum gauges stay accurate."""
+    multiprocess.mark_process_dead(worker.pid)
@@ -11,6 +11,10 @@ cd "$(dirname "$0")/.."
 HOST="${API_HOST:-0.0.0.0}"
 PORT="${API_PORT:-8000}"
 WORKERS="${API_WORKERS:-8}"
+# Settings divides the DB pool and load-shedding limit by API_WORKERS, so it
+# must see the same count gunicorn forks
+export API_WORKERS="$WORKERS"
+# UvicornWorker uses loop="auto", which selects uvloop when it is installed
 WORKER_CLASS="uvicorn.workers.UvicornWorker"
 WORKER_CONNECTIONS="${WORKER_CONNECTIONS:-1000}"
 MAX_REQUESTS="${MAX_REQUESTS:-10000}"
@@ -18,6 +22,13 @@ MAX_REQUESTS_JITTER="${MAX_REQUESTS_JITTER:-1000}"
 TIMEOUT="${TIMEOUT:-30}"
 GRACEFUL_TIMEOUT="${GRACEFUL_TIMEOUT:-30}"
 
+# Prometheus multiprocess mode: every worker writes its metrics to mmap-backed
+# files here and /metrics aggregates them. Stale files from a previous run
+# would be double counted, so the directory is reset on start.
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/atlas-prom}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 echo "Starting Atlas API in production mode..."
 echo "Host: $HOST"
 echo "Port: $PORT"
@@ -26,6 +37,7 @@ echo "Worker connections: $WORKER_CONNECTIONS"
 
 # Start Gunicorn with Uvicorn workers using Poetry
 exec poetry run gunicorn atlas_api.main:app \
+  --config scripts/gunicorn_conf.py \
   --bind "$HOST:$PORT" \
   --workers "$WORKERS" \
   --worker-class "$WORKER_CLASS" \
@@ -7,9 +7,14 @@ Implements DDIA reliability patterns:
 - Health checks and monitoring
 """
 
+import asyncio
 import logging
-from typing import AsyncGenerator
+import time
+from functools import cached_property
+from typing import Any, AsyncGenerator
 
+from fastapi import Request
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -18,10 +23,13 @@ from sqlalchemy.ext.asyncio import (
 )
 from sqlalchemy.pool import NullPool
 
-from atlas_api.config import Settings
+from atlas_api.config import FrozenSettings
 
 logger = logging.getLogger(__name__)
 
+# Health probe statement, built once and reused by every health check
+_HEALTH_STMT = text("SELECT 1")
+
 
 class DatabaseAdapter:
     """
@@ -31,16 +39,55 @@ class DatabaseAdapter:
     with optimized pool settings for high concurrency.
     """
 
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: FrozenSettings):
         """
         Initialize database adapter.
         
         Args:
-            settings: Application settings
+            settings: Frozen adapter settings snapshot
         """
         self.settings = settings
         self._engine: AsyncEngine | None = None
         self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        # Last health probe as (perf_counter timestamp, result)
+        self._last_check: tuple[float, dict[str, Any]] | None = None
+        self._health_lock = asyncio.Lock()
+
+    @cached_property
+    def _pool_kwargs(self) -> dict[str, Any]:
+        """Pool settings for create_async_engine, read from settings once."""
+        return {
+            "pool_size": self.settings.database_effective_pool_size,
+            "max_overflow": self.settings.database_effective_max_overflow,
+            "pool_timeout": self.settings.database_pool_timeout,
+            "pool_recycle": self.settings.database_pool_recycle,
+            # LIFO checkout keeps a small hot set of connections warm
+            "pool_use_lifo": True,
+        }
+
+    @cached_property
+    def _connect_args(self) -> dict[str, Any]:
+        """asyncpg connect arguments: statement caching and server settings."""
+        if self.settings.database_pgbouncer:
+            # pgbouncer (transaction pooling) can't route prepared statements
+            statement_cache_size = 0
+            prepared_statement_cache_size = 0
+        else:
+            statement_cache_size = self.settings.database_statement_cache_size
+            prepared_statement_cache_size = self.settings.database_prepared_statement_cache_size
+
+        return {
+            "statement_cache_size": statement_cache_size,
+            "prepared_statement_cache_size": prepared_statement_cache_size,
+            "server_settings": {
+                "jit": "on" if self.settings.database_jit else "off",
+                "application_name": self.settings.app_name,
+                # Server-side keepalives detect dead peers without pre-ping
+                "tcp_keepalives_idle": "60",
+                "tcp_keepalives_interval": "30",
+                "tcp_keepalives_count": "3",
+            },
+        }
 
     async def connect(self) -> None:
         """
@@ -52,26 +99,18 @@ class DatabaseAdapter:
             logger.warning("Database already connected")
             return
 
-        logger.info(
-            "Initializing database connection pool",
-            extra={
-                "pool_size": self.settings.database_pool_size,
-                "max_overflow": self.settings.database_max_overflow,
-                "pool_timeout": self.settings.database_pool_timeout,
-            },
-        )
+        pool_kwargs = self._pool_kwargs
+        logger.info("Initializing database connection pool", extra=pool_kwargs)
 
         # Create async engine with connection pooling
         # Note: Async engines use AsyncAdaptedQueuePool by default, no need to specify poolclass
         self._engine = create_async_engine(
-            str(self.settings.database_url),
+            self.settings.database_url_str,
             # Connection pool settings
-            pool_size=self.settings.database_pool_size,
-            max_overflow=self.settings.database_max_overflow,
-            pool_timeout=self.settings.database_pool_timeout,
-            pool_recycle=self.settings.database_pool_recycle,
-            pool_pre_ping=True,  # Verify connections before using
+            **pool_kwargs,
+            pool_pre_ping=self.settings.database_pool_pre_ping,
             # Performance settings
+            connect_args=self._connect_args,
             echo=self.settings.database_echo,
             echo_pool=False,
             # Async settings
@@ -120,45 +159,76 @@ class DatabaseAdapter:
         if self._session_factory is None:
             raise RuntimeError("Database not connected. Call connect() first.")
 
+        # AsyncSession.__aexit__ closes the session, which rolls back any
+        # transaction still in progress - no extra rollback/close awaits needed.
         async with self._session_factory() as session:
-            try:
-                yield session
-            except Exception:
-                await session.rollback()
-                raise
-            finally:
-                await session.close()
-
-    async def health_check(self) -> dict[str, any]:
+            yield session
+
+    async def health_check(self) -> dict[str, Any]:
         """
         Check database health.
-        
+
         Executes a simple query to verify database connectivity
-        and measure latency.
-        
+        and measure latency. The query is bounded by database_timeout;
+        on expiry the result is reported unhealthy with reason "timeout"
+        instead of raising.
+
+        Results are reused for health_check_ttl_ms, and concurrent callers
+        share a single in-flight probe rather than each hitting the database.
+
         Returns:
             dict: Health check results with latency and pool stats
-            
+
         Raises:
             Exception: If health check fails
         """
-        if self._engine is None:
+        engine = self._engine
+        if engine is None:
             raise RuntimeError("Database not connected")
 
-        import time
-        from sqlalchemy import text
+        ttl = self.settings.health_check_ttl_ms / 1000
+        last = self._last_check
+        if last is not None and time.perf_counter() - last[0] < ttl:
+            return last[1]
 
-        start_time = time.time()
-        
-        async with self._engine.connect() as conn:
-            # Simple query to check connectivity
-            result = await conn.execute(text("SELECT 1 as health_check"))
-            row = result.fetchone()
-            
-        latency_ms = (time.time() - start_time) * 1000
+        async with self._health_lock:
+            # Another caller may have refreshed the result while we waited
+            last = self._last_check
+            if last is not None and time.perf_counter() - last[0] < ttl:
+                return last[1]
+
+            result = await self._probe_health(engine)
+            self._last_check = (time.perf_counter(), result)
+            return result
+
+    async def _probe_health(self, engine: AsyncEngine) -> dict[str, Any]:
+        """
+        Run the health query against the database, uncached.
+
+        Args:
+            engine: Connected engine to probe
+        """
+        start_ns = time.perf_counter_ns()
+
+        # Bound the probe so an unreachable database can't stall /health
+        # until pool_timeout expires
+        try:
+            async with asyncio.timeout(self.settings.database_timeout):
+                async with engine.connect() as conn:
+                    # Simple query to check connectivity
+                    result = await conn.execute(_HEALTH_STMT)
+                    row = result.fetchone()
+            # No row means the probe didn't answer as expected
+            healthy = row is not None and row[0] == 1
+            reason = None
+        except TimeoutError:
+            healthy = False
+            reason = "timeout"
+
+        latency_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
 
         # Get pool statistics
-        pool = self._engine.pool
+        pool = engine.pool
         pool_stats = {
             "size": pool.size(),
             "checked_in": pool.checkedin(),
@@ -168,7 +238,8 @@ class DatabaseAdapter:
         }
 
         return {
-            "healthy": row[0] == 1,
+            "healthy": healthy,
+            "reason": reason,
             "latency_ms": round(latency_ms, 2),
             "pool": pool_stats,
         }
@@ -188,39 +259,31 @@ class DatabaseAdapter:
         return self._session_factory
 
 
-# Global database adapter instance
-_db_adapter: DatabaseAdapter | None = None
+def get_database_adapter(request: Request) -> DatabaseAdapter:
+    """
+    FastAPI dependency for the database adapter.
 
+    The adapter is constructed once during application lifespan startup and
+    stored on ``app.state.db``, so resolution is a single attribute read.
 
-def get_database_adapter(settings: Settings | None = None) -> DatabaseAdapter:
-    """
-    Get global database adapter instance.
-    
     Args:
-        settings: Application settings (required on first call)
-        
+        request: Incoming request
+
     Returns:
-        DatabaseAdapter: Global database adapter
+        DatabaseAdapter: Application database adapter
     """
-    global _db_adapter
-    
-    if _db_adapter is None:
-        if settings is None:
-            from atlas_api.config import get_settings
-            settings = get_settings()
-        _db_adapter = DatabaseAdapter(settings)
-    
-    return _db_adapter
+    return request.app.state.db
 
 
-async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
+async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
     FastAPI dependency for database sessions.
     
+    Args:
+        request: Incoming request
+
     Yields:
         AsyncSession: Database session
     """
-    db = get_database_adapter()
-    async for session in db.get_session():
+    async with request.app.state.db.session_factory() as session:
         yield session
-
@@ -8,17 +8,42 @@ Implements DDIA reliability patterns:
 - Health checks
 """
 
+import asyncio
 import logging
-from typing import Any
+import socket
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
 
+import orjson
+from fastapi import Request
 import redis.asyncio as aioredis
 from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio.client import Pipeline
 from redis.exceptions import RedisError
 
-from atlas_api.config import Settings
+from atlas_api.config import FrozenSettings
+from atlas_api.reliability.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitOpenError,
+)
 
 logger = logging.getLogger(__name__)
 
+# TCP keepalive tuning for Redis sockets: probe after 60s idle, every 30s,
+# give up after 3 misses. Options missing on this platform are skipped.
+# (redis-py already sets TCP_NODELAY on every TCP connection.)
+_TCP_KEEPALIVE_OPTIONS = {
+    opt: value
+    for opt, value in (
+        (getattr(socket, "TCP_KEEPIDLE", None), 60),
+        (getattr(socket, "TCP_KEEPINTVL", None), 30),
+        (getattr(socket, "TCP_KEEPCNT", None), 3),
+    )
+    if opt is not None
+}
+
 
 class RedisAdapter:
     """
@@ -26,18 +51,34 @@ class RedisAdapter:
     
     Manages Redis connections with optimized pool settings
     for high-throughput caching operations.
+
+    Each get/set/delete call is a full network round-trip. When a request
+    touches several keys, prefer the batched helpers (mget/mset) or the
+    pipeline() context manager over per-key loops so the commands share
+    a single round-trip.
     """
 
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: FrozenSettings):
         """
         Initialize Redis adapter.
         
         Args:
-            settings: Application settings
+            settings: Frozen adapter settings snapshot
         """
         self.settings = settings
         self._pool: ConnectionPool | None = None
         self._client: Redis | None = None
+        # Fail fast while Redis is down or slow instead of paying
+        # socket_timeout on every call
+        self._breaker = CircuitBreaker(
+            "redis",
+            CircuitBreakerConfig(
+                failure_threshold=settings.circuit_breaker_failure_threshold,
+                recovery_timeout_seconds=settings.circuit_breaker_recovery_timeout,
+                slow_call_threshold_ms=settings.circuit_breaker_slow_call_ms or None,
+            ),
+            exceptions=(RedisError,),
+        )
 
     async def connect(self) -> None:
         """
@@ -54,19 +95,38 @@ class RedisAdapter:
             extra={
                 "max_connections": self.settings.redis_max_connections,
                 "socket_timeout": self.settings.redis_socket_timeout,
+                "unix_socket_path": self.settings.redis_unix_socket_path,
             },
         )
 
+        pool_kwargs: dict[str, Any] = {
+            "max_connections": self.settings.redis_max_connections,
+            "socket_timeout": self.settings.redis_socket_timeout,
+            "socket_connect_timeout": self.settings.redis_socket_connect_timeout,
+            "retry_on_timeout": self.settings.redis_retry_on_timeout,
+            "decode_responses": self.settings.redis_decode_responses,
+            "health_check_interval": 30,  # Check connection health every 30s
+        }
+
         # Create connection pool
-        self._pool = ConnectionPool.from_url(
-            str(self.settings.redis_url),
-            max_connections=self.settings.redis_max_connections,
-            socket_timeout=self.settings.redis_socket_timeout,
-            socket_connect_timeout=self.settings.redis_socket_connect_timeout,
-            retry_on_timeout=self.settings.redis_retry_on_timeout,
-            decode_responses=self.settings.redis_decode_responses,
-            health_check_interval=30,  # Check connection health every 30s
-        )
+        if self.settings.redis_unix_socket_path:
+            # Co-located Redis: a Unix domain socket skips the TCP/IP stack entirely
+            redis_url = self.settings.redis_url
+            self._pool = ConnectionPool(
+                connection_class=aioredis.UnixDomainSocketConnection,
+                path=self.settings.redis_unix_socket_path,
+                db=int((redis_url.path or "/0").lstrip("/") or 0),
+                username=redis_url.username,
+                password=redis_url.password,
+                **pool_kwargs,
+            )
+        else:
+            self._pool = ConnectionPool.from_url(
+                self.settings.redis_url_str,
+                socket_keepalive=True,
+                socket_keepalive_options=_TCP_KEEPALIVE_OPTIONS,
+                **pool_kwargs,
+            )
 
         # Create Redis client
         self._client = Redis(connection_pool=self._pool)
@@ -93,29 +153,63 @@ class RedisAdapter:
         
         logger.info("Redis connection pool closed")
 
-    async def get(self, key: str) -> str | None:
+    async def get(self, key: str) -> bytes | None:
         """
-        Get value from Redis.
+        Get raw value from Redis.
         
         Args:
             key: Cache key
             
         Returns:
-            str | None: Cached value or None if not found
+            bytes | None: Cached value or None if not found
         """
         if self._client is None:
             raise RuntimeError("Redis not connected")
 
         try:
-            return await self._client.get(key)
+            return await self._breaker.call_async(self._client.get, key)
+        except CircuitOpenError:
+            return None
         except RedisError as e:
             logger.error(f"Redis GET error: {e}", exc_info=True)
             return None
 
+    async def get_str(self, key: str) -> str | None:
+        """
+        Get value from Redis decoded as UTF-8.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            str | None: Cached value or None if not found
+        """
+        raw = await self.get(key)
+        if raw is None or isinstance(raw, str):
+            return raw
+        return raw.decode()
+
+    async def get_json(self, key: str) -> Any:
+        """
+        Get a JSON value from Redis.
+
+        Parses the raw bytes with orjson directly, skipping the intermediate str.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Any: Decoded JSON value or None if not found
+        """
+        raw = await self.get(key)
+        if raw is None:
+            return None
+        return orjson.loads(raw)
+
     async def set(
         self, 
         key: str, 
-        value: str, 
+        value: str | bytes, 
         ex: int | None = None
     ) -> bool:
         """
@@ -133,8 +227,10 @@ class RedisAdapter:
             raise RuntimeError("Redis not connected")
 
         try:
-            await self._client.set(key, value, ex=ex)
+            await self._breaker.call_async(self._client.set, key, value, ex=ex)
             return True
+        except CircuitOpenError:
+            return False
         except RedisError as e:
             logger.error(f"Redis SET error: {e}", exc_info=True)
             return False
@@ -153,41 +249,173 @@ class RedisAdapter:
             raise RuntimeError("Redis not connected")
 
         try:
-            result = await self._client.delete(key)
+            result = await self._breaker.call_async(self._client.delete, key)
             return result > 0
+        except CircuitOpenError:
+            return False
         except RedisError as e:
             logger.error(f"Redis DELETE error: {e}", exc_info=True)
             return False
 
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        """
+        Get multiple values from Redis in a single round-trip.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            list[bytes | None]: Values in key order (None for missing keys or on error)
+        """
+        if self._client is None:
+            raise RuntimeError("Redis not connected")
+
+        if not keys:
+            return []
+
+        try:
+            return await self._breaker.call_async(self._client.mget, keys)
+        except CircuitOpenError:
+            return [None] * len(keys)
+        except RedisError as e:
+            logger.error(f"Redis MGET error: {e}", exc_info=True)
+            return [None] * len(keys)
+
+    async def mset(self, mapping: dict[str, str | bytes], ex: int | None = None) -> bool:
+        """
+        Set multiple values in Redis in a single round-trip.
+
+        Uses a non-transactional pipeline so a per-key expiration can be
+        applied (plain MSET does not support EX).
+
+        Args:
+            mapping: Key/value pairs to cache
+            ex: Expiration time in seconds applied to every key
+
+        Returns:
+            bool: True if successful
+        """
+        if self._client is None:
+            raise RuntimeError("Redis not connected")
+
+        if not mapping:
+            return True
+
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    pipe.set(key, value, ex=ex)
+                await self._breaker.call_async(pipe.execute)
+            return True
+        except CircuitOpenError:
+            return False
+        except RedisError as e:
+            logger.error(f"Redis MSET error: {e}", exc_info=True)
+            return False
+
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = False) -> AsyncIterator[Pipeline]:
+        """
+        Batch arbitrary commands into one round-trip.
+
+        Queue commands on the yielded pipeline and call ``await pipe.execute()``
+        to send them.
+
+        Args:
+            transaction: Wrap the batch in MULTI/EXEC
+
+        Yields:
+            Pipeline: Redis pipeline bound to the shared connection pool
+        """
+        if self._client is None:
+            raise RuntimeError("Redis not connected")
+
+        async with self._client.pipeline(transaction=transaction) as pipe:
+            yield pipe
+
     async def health_check(self) -> dict[str, Any]:
         """
         Check Redis health.
-        
+
         Executes PING command to verify connectivity and measure latency.
-        
+        The PING is bounded by redis_timeout; on expiry the result is
+        reported unhealthy with reason "timeout" instead of raising.
+
+        Server details are not fetched here; use detailed_health_check()
+        for those.
+
         Returns:
             dict: Health check results with latency
-            
+
         Raises:
             Exception: If health check fails
         """
-        if self._client is None:
+        client = self._client
+        if client is None:
             raise RuntimeError("Redis not connected")
 
-        import time
+        start_ns = time.perf_counter_ns()
 
-        start_time = time.time()
-        
-        # PING command to check connectivity
-        pong = await self._client.ping()
-        
-        latency_ms = (time.time() - start_time) * 1000
+        # PING command to check connectivity, bounded by redis_timeout
+        try:
+            async with asyncio.timeout(self.settings.redis_timeout):
+                pong = await client.ping()
+        except TimeoutError:
+            return {
+                "healthy": False,
+                "reason": "timeout",
+                "latency_ms": round((time.perf_counter_ns() - start_ns) / 1_000_000, 2),
+            }
 
-        # Get Redis info
-        info = await self._client.info("server")
+        latency_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
 
         return {
             "healthy": pong is True,
+            "reason": None,
+            "latency_ms": round(latency_ms, 2),
+        }
+
+    async def detailed_health_check(self) -> dict[str, Any]:
+        """
+        Check Redis health and report server version and uptime.
+
+        PING and INFO are sent in one pipeline so the report costs a single
+        round-trip; latency is measured around that round-trip. INFO builds a
+        large reply on the server, so this is kept out of health_check(); the
+        deep health endpoint caches its dependency results, so this runs at
+        most once per health_check_ttl_ms.
+
+        Returns:
+            dict: Health check results with latency, version and uptime
+
+        Raises:
+            Exception: If health check fails
+        """
+        if self._client is None:
+            raise RuntimeError("Redis not connected")
+
+        start_ns = time.perf_counter_ns()
+
+        try:
+            async with asyncio.timeout(self.settings.redis_timeout):
+                async with self._client.pipeline(transaction=False) as pipe:
+                    pipe.ping()
+                    pipe.info("server")
+                    pong, info = await pipe.execute()
+        except TimeoutError:
+            return {
+                "healthy": False,
+                "reason": "timeout",
+                "latency_ms": round((time.perf_counter_ns() - start_ns) / 1_000_000, 2),
+                "version": "unknown",
+                "uptime_seconds": 0,
+            }
+
+        latency_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
+
+        return {
+            "healthy": pong is True,
+            "reason": None,
             "latency_ms": round(latency_ms, 2),
             "version": info.get("redis_version", "unknown"),
             "uptime_seconds": info.get("uptime_in_seconds", 0),
@@ -201,27 +429,17 @@ class RedisAdapter:
         return self._client
 
 
-# Global Redis adapter instance
-_redis_adapter: RedisAdapter | None = None
+def get_redis_adapter(request: Request) -> RedisAdapter:
+    """
+    FastAPI dependency for the Redis adapter.
 
+    The adapter is constructed once during application lifespan startup and
+    stored on ``app.state.redis``, so resolution is a single attribute read.
 
-def get_redis_adapter(settings: Settings | None = None) -> RedisAdapter:
-    """
-    Get global Redis adapter instance.
-    
     Args:
-        settings: Application settings (required on first call)
-        
+        request: Incoming request
+
     Returns:
-        RedisAdapter: Global Redis adapter
+        RedisAdapter: Application Redis adapter
     """
-    global _redis_adapter
-    
-    if _redis_adapter is None:
-        if settings is None:
-            from atlas_api.config import get_settings
-            settings = get_settings()
-        _redis_adapter = RedisAdapter(settings)
-    
-    return _redis_adapter
-
+    return request.app.state.redis
@@ -9,26 +9,28 @@ import logging
 import sys
 from typing import Any
 
+import orjson
 import structlog
-from structlog.types import EventDict, Processor
+from structlog.types import Processor
 
 from atlas_api.config import Settings
 
 
-def add_app_context(logger: Any, method_name: str, event_dict: EventDict) -> EventDict:
+def _orjson_dumps(value: Any, **kwargs: Any) -> str:
     """
-    Add application context to log events.
+    Serialize a log event with orjson.
+
+    Drop-in serializer for JSONRenderer; honours the ``default`` fallback
+    structlog passes for objects orjson can't encode natively.
 
     Args:
-        logger: Logger instance
-        method_name: Method name being called
-        event_dict: Event dictionary
+        value: Event dictionary
+        **kwargs: Keyword arguments from JSONRenderer (only ``default`` is used)
 
     Returns:
-        EventDict: Enhanced event dictionary
+        str: JSON-encoded event
     """
-    event_dict["app"] = "atlas-api"
-    return event_dict
+    return orjson.dumps(value, default=kwargs.get("default"), option=orjson.OPT_UTC_Z).decode()
 
 
 def setup_logging(settings: Settings) -> None:
@@ -57,30 +59,39 @@ def setup_logging(settings: Settings) -> None:
         structlog.stdlib.add_logger_name,
         structlog.stdlib.add_log_level,
         structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        add_app_context,
     ]
 
+    # Bind static app context once; merge_contextvars picks it up for every
+    # record without an extra per-record processor call. Contexts created
+    # afterwards (including request tasks) inherit it.
+    structlog.contextvars.bind_contextvars(app=settings.app_name)
+
     # Environment-specific processors
     if settings.is_production or settings.environment == "staging":
         # JSON formatting for production (machine-readable)
+        # Epoch timestamps and orjson keep per-record serialization cheap
         processors = shared_processors + [
+            structlog.processors.TimeStamper(fmt=None, utc=True),
             structlog.processors.format_exc_info,
             structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer(),
+            structlog.processors.JSONRenderer(serializer=_orjson_dumps),
         ]
     else:
         # Console formatting for development (human-readable)
         processors = shared_processors + [
+            structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.ExceptionPrettyPrinter(),
             structlog.dev.ConsoleRenderer(colors=True),
         ]
 
     # Configure structlog
+    # The filtering bound logger replaces below-threshold methods with no-ops,
+    # so filtered calls skip the processor chain entirely. Note that call
+    # arguments are still evaluated: logger.debug("x", data=compute()) runs
+    # compute() even when DEBUG is off.
     structlog.configure(
         processors=processors,
-        wrapper_class=structlog.stdlib.BoundLogger,
+        wrapper_class=structlog.make_filtering_bound_logger(log_level),
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
         cache_logger_on_first_use=True,
@@ -92,8 +103,16 @@ def setup_logging(settings: Settings) -> None:
     logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
     logging.getLogger("aiokafka").setLevel(logging.WARNING)
 
+    # In production with SQL echo off, silence SQLAlchemy's engine/pool loggers
+    # outright so their records never reach level checks or handler lookup
+    if settings.is_production and not settings.database_echo:
+        for name in ("sqlalchemy.engine", "sqlalchemy.pool"):
+            sql_logger = logging.getLogger(name)
+            sql_logger.disabled = True
+            sql_logger.propagate = False
+
 
-def get_logger(name: str) -> structlog.stdlib.BoundLogger:
+def get_logger(name: str) -> structlog.typing.FilteringBoundLogger:
     """
     Get a structured logger instance.
 
@@ -101,7 +120,7 @@ def get_logger(name: str) -> structlog.stdlib.BoundLogger:
         name: Logger name (typically __name__)
 
     Returns:
-        BoundLogger: Configured logger instance
+        FilteringBoundLogger: Configured logger instance
     """
     return structlog.get_logger(name)
 
@@ -3,149 +3,499 @@ Prometheus metrics instrumentation.
 
 Implements RED (Rate, Errors, Duration) metrics and custom business metrics.
 Follows DDIA Chapter 1 principles for monitoring system health.
+
+The HTTP ``endpoint`` label is always a route template (``/users/{user_id}``)
+or "unmatched". Raw request paths must never be used as a label value: every
+distinct ID would create a new series.
 """
 
-from prometheus_client import Counter, Gauge, Histogram, Info
+import os
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, Info
+from prometheus_client.core import GaugeMetricFamily, HistogramMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+from prometheus_client.registry import Collector
+from prometheus_client.utils import floatToGoString
+from starlette.routing import BaseRoute
+
+# Under gunicorn with several workers, prometheus_client aggregates metrics
+# across processes through mmap-backed files in PROMETHEUS_MULTIPROC_DIR. The
+# lock-free in-process collectors below cannot be aggregated that way, so in
+# multiprocess mode the stock prometheus_client types are used instead.
+MULTIPROCESS_MODE = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+class FastHistogram:
+    """
+    Single histogram series with fixed buckets and no lock.
+
+    prometheus_client's Histogram takes a lock and walks its buckets on every
+    observe(). Observations here all happen on one worker's event loop
+    thread, so a bisect into the bucket bounds plus two adds is enough.
+    Counts are per bucket (not cumulative) and are summed at scrape time.
+    """
+
+    __slots__ = ("upper_bounds", "counts", "sum")
+
+    def __init__(self, upper_bounds: tuple[float, ...]) -> None:
+        """
+        Initialize histogram series.
+
+        Args:
+            upper_bounds: Sorted finite bucket upper bounds
+        """
+        self.upper_bounds = upper_bounds
+        # One slot per bound plus the +Inf bucket
+        self.counts = array("Q", [0] * (len(upper_bounds) + 1))
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Record an observation.
+
+        Args:
+            value: Observed value
+        """
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+
+
+class HistogramCollector(Collector):
+    """
+    Labeled family of FastHistogram series, exposed at scrape time.
+
+    Drop-in for the prometheus_client Histogram API used in this module:
+    ``labels(...)`` returns a series with ``observe()``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float],
+        registry: CollectorRegistry | None = REGISTRY,
+    ) -> None:
+        """
+        Initialize and register the histogram family.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Label names
+            buckets: Finite bucket upper bounds
+            registry: Registry to register with (None skips registration)
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.upper_bounds = tuple(sorted(float(b) for b in buckets))
+        self._bound_strs = [floatToGoString(b) for b in self.upper_bounds] + ["+Inf"]
+        self._children: dict[tuple[str, ...], FastHistogram] = {}
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *labelvalues: Any, **labelkwargs: Any) -> FastHistogram:
+        """
+        Get the series for a label set, creating it on first use.
+
+        Args:
+            *labelvalues: Label values in labelnames order
+            **labelkwargs: Label values by name
+
+        Returns:
+            FastHistogram: Series for the label set
+        """
+        if labelkwargs:
+            labelvalues = tuple(labelkwargs[name] for name in self.labelnames)
+        key = tuple(str(value) for value in labelvalues)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = FastHistogram(self.upper_bounds)
+        return child
+
+    def collect(self) -> Iterator[HistogramMetricFamily]:
+        """
+        Emit every series with cumulative buckets, summed in one pass.
+
+        Every bucket is emitted, empty or not, so each ``le`` series exists
+        from the first scrape as with prometheus_client histograms; otherwise
+        rate() would drop a bucket's first count.
+        """
+        family = HistogramMetricFamily(self.name, self.documentation, labels=self.labelnames)
+        bounds = self._bound_strs
+        for key, child in list(self._children.items()):
+            cumulative = 0
+            buckets = []
+            for bound, count in zip(bounds, child.counts):
+                cumulative += count
+                buckets.append((bound, cumulative))
+            family.add_metric(list(key), buckets, child.sum)
+        yield family
+
+
+def _get_or_create(cls: Callable[..., Any], name: str, *args: Any, **kwargs: Any) -> Any:
+    """
+    Return the collector already registered under a metric name, or create it.
+
+    Re-executing this module (importlib.reload, or importing it under a second
+    module name) would otherwise fail with "Duplicated timeseries" or leave a
+    second copy of every metric for each scrape to walk.
+
+    Args:
+        cls: Collector class (Counter, Gauge, ...) to create if missing
+        name: Metric name
+        *args: Further constructor arguments
+        **kwargs: Further constructor keyword arguments
+
+    Returns:
+        The registered collector
+    """
+    existing = REGISTRY._names_to_collectors.get(name)
+    if existing is not None:
+        return existing
+    return cls(name, *args, **kwargs)
+
+
+def _latency_histogram(
+    name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float]
+) -> Any:
+    """Create a latency histogram suited to the current process model."""
+    cls = Histogram if MULTIPROCESS_MODE else HistogramCollector
+    return _get_or_create(cls, name, documentation, labelnames, buckets=buckets)
+
 
 # Application info
-app_info = Info("atlas_api", "Application information")
+app_info = _get_or_create(Info, "atlas_api", "Application information")
 
 # HTTP metrics (RED method)
 # DDIA Chapter 1: RED metrics (Rate, Errors, Duration) are essential for monitoring
-http_requests_total = Counter(
+http_requests_total = _get_or_create(
+    Counter,
     "atlas_api_http_requests_total",
     "Total HTTP requests (Rate)",
     ["method", "endpoint", "status"],
 )
 
-http_request_duration_seconds = Histogram(
+http_request_duration_seconds = _latency_histogram(
     "atlas_api_http_request_duration_seconds",
     "HTTP request duration in seconds (Duration)",
     ["method", "endpoint"],
     buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
 )
 
-http_requests_in_progress = Gauge(
-    "atlas_api_http_requests_in_progress",
-    "HTTP requests currently in progress",
-    ["method", "endpoint"],
-)
 
-# Error metrics by route
-http_errors_total = Counter(
-    "atlas_api_http_errors_total",
-    "Total HTTP errors by route (Errors)",
-    ["method", "endpoint", "status_code"],
-)
+class _InProgressCollector(Collector):
+    """Expose the in-progress request counts as a gauge at scrape time."""
 
-http_5xx_errors_total = Counter(
-    "atlas_api_http_5xx_errors_total",
-    "Total 5xx server errors",
-    ["method", "endpoint"],
-)
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.counts: defaultdict[tuple[str, str], int] = defaultdict(int)
+        REGISTRY.register(self)
 
-http_4xx_errors_total = Counter(
-    "atlas_api_http_4xx_errors_total",
-    "Total 4xx client errors",
-    ["method", "endpoint"],
-)
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        family = GaugeMetricFamily(
+            self.name,
+            "HTTP requests currently in progress",
+            labels=["method", "endpoint"],
+        )
+        for (method, endpoint), value in list(self.counts.items()):
+            family.add_metric([method, endpoint], value)
+        yield family
+
+
+class _GaugeBackedCounts(defaultdict):
+    """In-progress counts that mirror every write into a multiprocess Gauge."""
+
+    def __init__(self, gauge: Gauge) -> None:
+        super().__init__(int)
+        self._gauge = gauge
+
+    def __setitem__(self, key: tuple[str, str], value: int) -> None:
+        super().__setitem__(key, value)
+        self._gauge.labels(*key).set(value)
+
+
+# Requests currently being served, keyed by (method, endpoint). A worker's
+# requests all run on its event loop thread, so the middleware updates these
+# with a plain int add instead of a locked Gauge.inc()/dec(); the gauge is
+# only materialized when Prometheus scrapes. In multiprocess mode writes go
+# to a livesum Gauge so the value is summed across live workers.
+http_requests_in_progress: defaultdict[tuple[str, str], int]
+if MULTIPROCESS_MODE:
+    http_requests_in_progress = _GaugeBackedCounts(
+        _get_or_create(
+            Gauge,
+            "atlas_api_http_requests_in_progress",
+            "HTTP requests currently in progress",
+            ["method", "endpoint"],
+            multiprocess_mode="livesum",
+        )
+    )
+else:
+    http_requests_in_progress = _get_or_create(
+        _InProgressCollector, "atlas_api_http_requests_in_progress"
+    ).counts
+
+# Status is recorded as a class ("2xx", "5xx", ...) to keep cardinality bounded
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx", "error")
+
+# Status code -> class label for every valid code, so the per-request lookup
+# is a single dict get that returns a shared string
+STATUS_CLASS: dict[int, str] = {code: STATUS_CLASSES[code // 100 - 1] for code in range(100, 600)}
+
+# Pre-bound label children keyed by (method, endpoint): the request counters
+# by status class and the duration series. Resolving a child via .labels()
+# hashes the label tuple under a lock on every call; the hot path does a
+# single lookup here instead.
+_REQUEST_CHILDREN: dict[tuple[str, str], tuple[dict[str, Any], Any]] = {}
+
+
+def status_class(status: int) -> str:
+    """
+    Bucket an HTTP status code into its class label.
+
+    Args:
+        status: HTTP status code
+
+    Returns:
+        str: Status class, e.g. "2xx" or "5xx"
+    """
+    return STATUS_CLASS.get(status, "error")
+
+
+def _bind_request_metrics(method: str, endpoint: str) -> tuple[dict[str, Any], Any]:
+    """Resolve and cache the HTTP metric children for a method/endpoint pair."""
+    children = (
+        {
+            cls: http_requests_total.labels(method=method, endpoint=endpoint, status=cls)
+            for cls in STATUS_CLASSES
+        },
+        http_request_duration_seconds.labels(method=method, endpoint=endpoint),
+    )
+    _REQUEST_CHILDREN[(method, endpoint)] = children
+    http_requests_in_progress.setdefault((method, endpoint), 0)
+    return children
+
+
+def record_request(method: str, endpoint: str, status: str, duration: float) -> None:
+    """
+    Record a completed request on the pre-bound RED metric children.
+
+    Args:
+        method: HTTP method
+        endpoint: Normalized endpoint path
+        status: Status class from status_class(), or "error"
+        duration: Request duration in seconds
+    """
+    children = _REQUEST_CHILDREN.get((method, endpoint))
+    if children is None:
+        children = _bind_request_metrics(method, endpoint)
+    counters, duration_child = children
+    counters[status].inc()
+    duration_child.observe(duration)
+
+
+# Error rates are derived from the status label of http_requests_total at
+# query time (see config/rules/http.yml) rather than from separate counters
 
 # Database metrics
-db_connections_total = Gauge(
+db_connections_total = _get_or_create(
+    Gauge,
     "atlas_api_db_connections_total",
     "Total database connections",
     ["state"],  # active, idle
 )
 
-db_query_duration_seconds = Histogram(
+db_query_duration_seconds = _latency_histogram(
     "atlas_api_db_query_duration_seconds",
     "Database query duration in seconds",
     ["operation"],
     buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
 )
 
-db_errors_total = Counter(
+db_errors_total = _get_or_create(
+    Counter,
     "atlas_api_db_errors_total",
     "Total database errors",
     ["operation", "error_type"],
 )
 
 # Cache metrics
-cache_operations_total = Counter(
+cache_operations_total = _get_or_create(
+    Counter,
     "atlas_api_cache_operations_total",
     "Total cache operations",
     ["operation", "status"],  # operation: get/set/delete, status: hit/miss/error
 )
 
-cache_hit_ratio = Gauge(
+cache_hit_ratio = _get_or_create(
+    Gauge,
     "atlas_api_cache_hit_ratio",
     "Cache hit ratio (0-1)",
 )
 
 # Kafka metrics
-kafka_messages_produced_total = Counter(
+kafka_messages_produced_total = _get_or_create(
+    Counter,
     "atlas_api_kafka_messages_produced_total",
     "Total Kafka messages produced",
     ["topic", "status"],  # status: success/error
 )
 
-kafka_messages_consumed_total = Counter(
+kafka_messages_consumed_total = _get_or_create(
+    Counter,
     "atlas_api_kafka_messages_consumed_total",
     "Total Kafka messages consumed",
     ["topic", "consumer_group"],
 )
 
-kafka_consumer_lag = Gauge(
+kafka_consumer_lag = _get_or_create(
+    Gauge,
     "atlas_api_kafka_consumer_lag",
     "Kafka consumer lag",
     ["topic", "partition", "consumer_group"],
 )
 
 # Circuit breaker metrics
-circuit_breaker_state = Gauge(
+circuit_breaker_state = _get_or_create(
+    Gauge,
     "atlas_api_circuit_breaker_state",
     "Circuit breaker state (0=closed, 1=open, 2=half-open)",
     ["service"],
 )
 
-circuit_breaker_failures_total = Counter(
+circuit_breaker_failures_total = _get_or_create(
+    Counter,
     "atlas_api_circuit_breaker_failures_total",
     "Total circuit breaker failures",
     ["service"],
 )
 
 # Retry metrics
-retry_attempts_total = Counter(
+retry_attempts_total = _get_or_create(
+    Counter,
     "atlas_api_retry_attempts_total",
     "Total retry attempts",
     ["operation", "attempt"],
 )
 
+# Attempts past this share one "N+" label value, bounding the series per
+# operation regardless of how high max_attempts is configured
+RETRY_ATTEMPT_LABEL_LIMIT = 10
+_RETRY_ATTEMPT_OVERFLOW = f"{RETRY_ATTEMPT_LABEL_LIMIT}+"
+
+
+def bind_retry_counters(operation: str, max_attempts: int) -> tuple[Any, ...]:
+    """
+    Resolve the retry counter children for every attempt of an operation.
+
+    Retry decorators call this once when they wrap a function and then count
+    a failed attempt with ``counters[attempt].inc()``, skipping labels().
+
+    Args:
+        operation: Name of the retried function
+        max_attempts: Maximum number of attempts made per call
+
+    Returns:
+        tuple: Counter child for each 0-based attempt index
+    """
+    overflow = None
+    children = []
+    for attempt in range(1, max_attempts + 1):
+        if attempt <= RETRY_ATTEMPT_LABEL_LIMIT:
+            children.append(retry_attempts_total.labels(operation=operation, attempt=str(attempt)))
+        else:
+            if overflow is None:
+                overflow = retry_attempts_total.labels(
+                    operation=operation, attempt=_RETRY_ATTEMPT_OVERFLOW
+                )
+            children.append(overflow)
+    return tuple(children)
+
+
 # Business metrics (examples)
-users_created_total = Counter(
+users_created_total = _get_or_create(
+    Counter,
     "atlas_api_users_created_total",
     "Total users created",
 )
 
-events_processed_total = Counter(
+events_processed_total = _get_or_create(
+    Counter,
     "atlas_api_events_processed_total",
     "Total events processed",
     ["event_type", "status"],
 )
 
 # System metrics
-system_health_status = Gauge(
+system_health_status = _get_or_create(
+    Gauge,
     "atlas_api_system_health_status",
     "System health status (1=healthy, 0=unhealthy)",
     ["component"],
 )
 
+HEALTH_COMPONENTS = ("api", "database", "redis", "kafka", "minio")
+
+# Health gauge children are bound once so updates skip the labels() lookup
+_HEALTH_CHILDREN = {
+    component: system_health_status.labels(component=component) for component in HEALTH_COMPONENTS
+}
+
+
+def set_health(component: str, healthy: bool) -> None:
+    """
+    Record the health of a system component.
+
+    Args:
+        component: One of HEALTH_COMPONENTS
+        healthy: Whether the component is currently healthy
+    """
+    _HEALTH_CHILDREN[component].set(1 if healthy else 0)
+
 
-def setup_metrics() -> None:
+def get_metrics_registry() -> CollectorRegistry:
+    """
+    Get the registry to serve on the scrape endpoint.
+
+    In multiprocess mode this is a fresh registry that aggregates every
+    worker's metric files; otherwise it is the default process registry.
+
+    Returns:
+        CollectorRegistry: Registry for the metrics ASGI app
+    """
+    if not MULTIPROCESS_MODE:
+        return REGISTRY
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    return registry
+
+
+def registered_collector_count() -> int:
+    """
+    Count the collectors registered in the default registry.
+
+    Returns:
+        int: Number of distinct registered collectors
+    """
+    return len(set(REGISTRY._names_to_collectors.values()))
+
+
+def setup_metrics(routes: Iterable[BaseRoute] = ()) -> None:
     """
     Initialize metrics with default values.
 
-    Sets up application info and default metric values.
+    Sets up application info and default metric values, and pre-binds the
+    HTTP metric children for every route template so the first request to
+    each does not pay for label resolution.
+
+    Args:
+        routes: Application routes to pre-bind HTTP metrics for
     """
     app_info.info(
         {
@@ -155,6 +505,13 @@ def setup_metrics() -> None:
     )
 
     # Initialize health status for all components
-    for component in ["api", "database", "redis", "kafka", "minio"]:
-        system_health_status.labels(component=component).set(0)
+    for component in HEALTH_COMPONENTS:
+        set_health(component, False)
 
+    for route in routes:
+        path = getattr(route, "path", None)
+        methods = getattr(route, "methods", None)
+        if not path or not methods:
+            continue
+        for method in methods:
+            _bind_request_metrics(method, path)
@@ -8,6 +8,7 @@ Follows DDIA principles for debugging distributed systems.
 import logging
 from typing import Optional
 
+from fastapi import FastAPI
 from opentelemetry import trace
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from opentelemetry.instrumentation.redis import RedisInstrumentor
@@ -15,6 +16,8 @@ from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 from atlas_api.config import Settings
 
@@ -22,11 +25,20 @@ logger = logging.getLogger(__name__)
 
 # Optional OTLP exporter - only imported if available
 try:
+    from grpc import Compression
     from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
     OTLP_AVAILABLE = True
 except ImportError:
     OTLP_AVAILABLE = False
     OTLPSpanExporter = None  # type: ignore
+    Compression = None  # type: ignore
+
+# Batch span export tuning: a deeper queue and larger, less frequent batches
+# amortize gRPC framing and export syscalls across many spans
+BSP_MAX_QUEUE_SIZE = 8192
+BSP_SCHEDULE_DELAY_MILLIS = 5000
+BSP_MAX_EXPORT_BATCH_SIZE = 1024
+BSP_EXPORT_TIMEOUT_MILLIS = 30000
 
 
 def setup_tracing(settings: Settings) -> None:
@@ -53,7 +65,11 @@ def setup_tracing(settings: Settings) -> None:
     )
 
     # Create tracer provider
-    tracer_provider = TracerProvider(resource=resource)
+    # Sample a fraction of new traces; child spans follow their parent's decision
+    tracer_provider = TracerProvider(
+        resource=resource,
+        sampler=ParentBased(TraceIdRatioBased(settings.otel_sampling_ratio)),
+    )
 
     # Add OTLP exporter if available
     if OTLP_AVAILABLE and OTLPSpanExporter is not None:
@@ -61,8 +77,17 @@ def setup_tracing(settings: Settings) -> None:
             otlp_exporter = OTLPSpanExporter(
                 endpoint=settings.otel_exporter_otlp_endpoint,
                 insecure=True,  # Use insecure for development
+                compression=Compression.Gzip,
+            )
+            tracer_provider.add_span_processor(
+                BatchSpanProcessor(
+                    otlp_exporter,
+                    max_queue_size=BSP_MAX_QUEUE_SIZE,
+                    schedule_delay_millis=BSP_SCHEDULE_DELAY_MILLIS,
+                    max_export_batch_size=BSP_MAX_EXPORT_BATCH_SIZE,
+                    export_timeout_millis=BSP_EXPORT_TIMEOUT_MILLIS,
+                )
             )
-            tracer_provider.add_span_processor(BatchSpanProcessor(otlp_exporter))
             logger.info(f"OTLP exporter configured: {settings.otel_exporter_otlp_endpoint}")
         except Exception as e:
             logger.warning(f"Failed to configure OTLP exporter: {e}")
@@ -72,16 +97,45 @@ def setup_tracing(settings: Settings) -> None:
     # Set global tracer provider
     trace.set_tracer_provider(tracer_provider)
 
-    # Auto-instrument libraries
+    # Auto-instrument libraries up front so the first request does not pay
+    # for patching. Redis is patched at class level; FastAPI and SQLAlchemy
+    # need the app and engine (see instrument_app and instrument_engine)
     try:
-        # FastAPI instrumentation will be done in main.py after app creation
-        # SQLAlchemyInstrumentor().instrument()  # Will be enabled when engine is created
-        # RedisInstrumentor().instrument()  # Will be enabled when Redis client is created
+        RedisInstrumentor().instrument()
         logger.info("OpenTelemetry auto-instrumentation configured")
     except Exception as e:
         logger.warning(f"Failed to configure auto-instrumentation: {e}")
 
 
+def instrument_app(app: FastAPI, settings: Settings) -> None:
+    """
+    Add OpenTelemetry request tracing to a FastAPI app.
+
+    Must be called before the app serves its first request (including the
+    lifespan startup), while middleware can still be added. URLs matching
+    ``settings.otel_excluded_urls`` (health probes, metrics scrapes) are
+    passed through without creating spans.
+
+    Args:
+        app: FastAPI application
+        settings: Application settings
+    """
+    FastAPIInstrumentor.instrument_app(app, excluded_urls=settings.otel_excluded_urls)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Trace queries issued through a SQLAlchemy async engine.
+
+    Args:
+        engine: Async engine created by the database adapter
+    """
+    try:
+        SQLAlchemyInstrumentor().instrument(engine=engine.sync_engine)
+    except Exception as e:
+        logger.warning(f"Failed to instrument SQLAlchemy engine: {e}")
+
+
 def get_tracer(name: str) -> trace.Tracer:
     """
     Get a tracer instance for manual instrumentation.
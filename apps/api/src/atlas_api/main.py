@@ -10,24 +10,26 @@ import logging
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
+import orjson
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from prometheus_client import make_asgi_app
 
-from atlas_api.adapters.database import get_database_adapter
-from atlas_api.adapters.redis import get_redis_adapter
-from atlas_api.config import get_settings
+from atlas_api.adapters.database import DatabaseAdapter
+from atlas_api.adapters.redis import RedisAdapter
+from atlas_api.config import get_frozen_settings, get_settings
 from atlas_api.instrumentation.logging import setup_logging
-from atlas_api.instrumentation.metrics import setup_metrics
-from atlas_api.instrumentation.tracing import setup_tracing
+from atlas_api.instrumentation.metrics import (
+    get_metrics_registry,
+    registered_collector_count,
+    setup_metrics,
+)
+from atlas_api.instrumentation.tracing import instrument_app, instrument_engine, setup_tracing
+from atlas_api.middleware.compression import SelectiveGZipMiddleware
 from atlas_api.middleware.reliability import (
-    ErrorHandlingMiddleware,
-    LoadSheddingMiddleware,
-    MetricsMiddleware,
-    RequestIDMiddleware,
-    TimeoutMiddleware,
+    FusedReliabilityMiddleware,
+    MetricsEndpointMiddleware,
 )
 from atlas_api.routers import health
 
@@ -63,21 +65,30 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     # Initialize observability
     if settings.prometheus_enabled:
-        setup_metrics()
-        logger.info("Prometheus metrics initialized")
+        setup_metrics(app.routes)
+        logger.info(
+            "Prometheus metrics initialized",
+            extra={"collectors": registered_collector_count()},
+        )
 
     if settings.otel_enabled:
         setup_tracing(settings)
         logger.info("OpenTelemetry tracing initialized")
 
     # Initialize database connection pool
-    db_adapter = get_database_adapter(settings)
+    # Adapters live on app.state so request dependencies resolve them with a
+    # single attribute read
+    db_adapter = DatabaseAdapter(get_frozen_settings())
     await db_adapter.connect()
+    app.state.db = db_adapter
+    if settings.otel_enabled:
+        instrument_engine(db_adapter.engine)
     logger.info("Database connection pool initialized")
 
     # Initialize Redis connection pool
-    redis_adapter = get_redis_adapter(settings)
+    redis_adapter = RedisAdapter(get_frozen_settings())
     await redis_adapter.connect()
+    app.state.redis = redis_adapter
     logger.info("Redis connection pool initialized")
 
     # TODO: Initialize Kafka producer/consumer
@@ -122,6 +133,7 @@ app = FastAPI(
     openapi_url="/openapi.json",
     lifespan=lifespan,
     debug=settings.debug,
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -137,19 +149,28 @@ app.add_middleware(
 
 # Add GZip middleware for response compression
 # DDIA: Reduce network bandwidth usage
-app.add_middleware(GZipMiddleware, minimum_size=1000)
-
-# Add reliability middleware (order matters - innermost first)
-# DDIA Chapter 1: These middleware implement reliability patterns
-# NOTE: LoadSheddingMiddleware disabled - has race condition bugs with shared counter
-# TODO: Rewrite using asyncio.Semaphore or Redis-based rate limiting
-# app.add_middleware(LoadSheddingMiddleware, max_concurrent_requests=1000)
-app.add_middleware(ErrorHandlingMiddleware)
-# NOTE: MetricsMiddleware disabled - BaseHTTPMiddleware has performance issues
-# TODO: Replace with Prometheus FastAPI Instrumentator or pure ASGI middleware
-# app.add_middleware(MetricsMiddleware)
-app.add_middleware(TimeoutMiddleware)
-app.add_middleware(RequestIDMiddleware)
+# Health probes and metrics scrapes skip compression entirely
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=1000)
+
+# Add reliability middleware
+# DDIA Chapter 1: Request IDs, load shedding, timeouts, metrics and error
+# handling, fused into one ASGI layer so each request pays for one hop.
+# Load shedding counts in-flight requests per worker process, so each worker
+# gets its share of the configured total.
+app.add_middleware(
+    FusedReliabilityMiddleware,
+    max_concurrent_requests=settings.max_concurrent_requests_per_worker,
+)
+
+# Trace requests; added here because middleware cannot be added once the
+# app has started, and inside the metrics endpoint so scrapes are not traced
+if settings.otel_enabled:
+    instrument_app(app, settings)
+
+# Serve Prometheus metrics from the outermost middleware so scrapes bypass
+# the middleware above and are not counted in their own request metrics
+if settings.prometheus_enabled:
+    app.add_middleware(MetricsEndpointMiddleware, metrics_app=make_asgi_app(get_metrics_registry()))
 
 # TODO: Add authentication middleware
 # TODO: Add request logging middleware
@@ -161,35 +182,45 @@ app.include_router(health.router, tags=["Health"])
 # app.include_router(users.router, prefix=f"{settings.api_prefix}/users", tags=["Users"])
 # app.include_router(events.router, prefix=f"{settings.api_prefix}/events", tags=["Events"])
 
-# Mount Prometheus metrics endpoint
-# Separate ASGI app to avoid middleware interference
-if settings.prometheus_enabled:
-    metrics_app = make_asgi_app()
-    app.mount("/metrics", metrics_app)
+
+# The root payload only depends on settings, so it is serialized once
+_ROOT_BODY = orjson.dumps(
+    {
+        "name": settings.app_name,
+        "version": settings.app_version,
+        "environment": settings.environment,
+        "docs": "/docs",
+        "health": "/health",
+        "metrics": "/metrics",
+    }
+)
 
 
 @app.get("/", include_in_schema=False)
-async def root() -> dict[str, str]:
+async def root() -> Response:
     """
     Root endpoint.
 
     Returns basic API information and links to documentation.
 
     Returns:
-        dict: API information
+        Response: Pre-serialized JSON API information
     """
-    return {
-        "name": settings.app_name,
-        "version": settings.app_version,
-        "environment": settings.environment,
-        "docs": "/docs",
-        "health": "/health",
-        "metrics": "/metrics",
+    return Response(content=_ROOT_BODY, media_type="application/json")
+
+
+# Production error responses never vary, so their body is serialized once
+_IS_PRODUCTION = settings.is_production
+_PRODUCTION_ERROR_BODY = orjson.dumps(
+    {
+        "error": "Internal server error",
+        "message": "An unexpected error occurred",
     }
+)
 
 
 @app.exception_handler(Exception)
-async def global_exception_handler(request, exc: Exception) -> JSONResponse:
+async def global_exception_handler(request, exc: Exception) -> Response:
     """
     Global exception handler.
 
@@ -201,7 +232,7 @@ async def global_exception_handler(request, exc: Exception) -> JSONResponse:
         exc: Exception that was raised
 
     Returns:
-        JSONResponse: Structured error response
+        Response: Structured JSON error response
     """
     logger.error(
         "Unhandled exception",
@@ -214,16 +245,14 @@ async def global_exception_handler(request, exc: Exception) -> JSONResponse:
     )
 
     # Don't expose internal errors in production
-    if settings.is_production:
-        return JSONResponse(
+    if _IS_PRODUCTION:
+        return Response(
+            content=_PRODUCTION_ERROR_BODY,
             status_code=500,
-            content={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred",
-            },
+            media_type="application/json",
         )
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
@@ -234,14 +263,18 @@ async def global_exception_handler(request, exc: Exception) -> JSONResponse:
 
 
 if __name__ == "__main__":
+    import sys
+
     import uvicorn
 
     # Run with uvicorn for development
     # In production, use gunicorn with uvicorn workers
+    # uvloop is not available on Windows; fall back to the asyncio loop there
     uvicorn.run(
         "atlas_api.main:app",
         host=settings.api_host,
         port=settings.api_port,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
         reload=settings.api_reload,
         log_level=settings.log_level.lower(),
         access_log=True,
@@ -7,23 +7,32 @@ Implements cross-cutting concerns:
 - Metrics collection
 - Error handling
 - Load shedding
+- Response compression
 
 Reference: DDIA Chapter 1 - Reliability, Scalability
 """
 
+from atlas_api.middleware.compression import SelectiveGZipMiddleware
 from atlas_api.middleware.reliability import (
     ErrorHandlingMiddleware,
+    FusedReliabilityMiddleware,
     LoadSheddingMiddleware,
+    MetricsEndpointMiddleware,
     MetricsMiddleware,
     RequestIDMiddleware,
     TimeoutMiddleware,
+    request_id_var,
 )
 
 __all__ = [
     "RequestIDMiddleware",
     "TimeoutMiddleware",
     "MetricsMiddleware",
+    "MetricsEndpointMiddleware",
     "ErrorHandlingMiddleware",
     "LoadSheddingMiddleware",
+    "FusedReliabilityMiddleware",
+    "SelectiveGZipMiddleware",
+    "request_id_var",
 ]
 
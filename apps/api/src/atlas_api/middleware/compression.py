@@ -0,0 +1,53 @@
+"""
+Response compression middleware.
+
+Wraps Starlette's GZipMiddleware so small, high-frequency responses skip the
+compression path entirely.
+"""
+
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """
+    GZip middleware that never engages for excluded path prefixes.
+
+    GZipMiddleware parses the request headers and wraps ``send`` to buffer the
+    first body chunk on every request. Health probes and metrics scrapes are
+    either tiny or read by clients that do not need compression, so they are
+    passed straight through.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        compresslevel: int = 9,
+        exclude_prefixes: tuple[str, ...] = ("/health", "/metrics"),
+    ) -> None:
+        """
+        Initialize selective GZip middleware.
+
+        Args:
+            app: Next ASGI application in the stack
+            minimum_size: Smallest response body in bytes that is compressed
+            compresslevel: zlib compression level
+            exclude_prefixes: Path prefixes that are never compressed
+        """
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.exclude_prefixes = exclude_prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Skip compression for excluded paths, otherwise defer to GZipMiddleware.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] == "http" and scope["path"].startswith(self.exclude_prefixes):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -7,31 +7,95 @@ Implements DDIA Chapter 1 patterns:
 - Request ID tracking for distributed tracing
 - Rate limiting and load shedding
 
+This module is written to compile with mypyc (``make compile``). Keep it fully
+annotated; without the compiled extension it runs as plain Python.
+
 Reference: DDIA Chapter 1 - Reliability, Scalability
 """
 
 import asyncio
 import logging
+import re
 import time
-import uuid
-from typing import Awaitable, Callable
+from contextvars import ContextVar
+from functools import lru_cache
+from os import urandom
+from typing import Any
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
 from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from atlas_api.config import get_settings
 from atlas_api.instrumentation.metrics import (
-    http_request_duration_seconds,
+    STATUS_CLASS,
     http_requests_in_progress,
-    http_requests_total,
+    record_request,
 )
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+_UUID_RE = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE
+)
+_NUMERIC_ID_RE = re.compile(r"/\d+")
+# Characters either ID pattern needs; paths without them skip both substitutions
+_ID_CHAR_RE = re.compile(r"[\d-]")
+
+# Health probes and metrics scrapes. They arrive on a fixed schedule, so
+# recording them only adds noise series, and a probe must not be shed.
+BYPASS_PATHS = frozenset({"/health", "/health/deep", "/health/ready", "/health/live", "/metrics"})
+
+# ID of the request being handled, set by RequestIDMiddleware (or the fused
+# middleware) for everything running inside it, including handlers
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_path(path: str) -> str:
+    """Normalize a path for metrics; memoized, as few distinct paths recur."""
+    if path.endswith("/"):
+        path = path.rstrip("/")
+    if _ID_CHAR_RE.search(path) is not None:
+        path = _UUID_RE.sub("{id}", path)
+        path = _NUMERIC_ID_RE.sub("/{id}", path)
+    return path or "/"
+
+
+def _request_id(scope: Scope) -> str:
+    """Return the client's X-Request-ID, or a new random 128-bit hex ID."""
+    name: bytes
+    value: bytes
+    for name, value in scope["headers"]:
+        if name == b"x-request-id" and value:
+            return value.decode("latin-1")
+    return urandom(16).hex()
+
+
+def _log_extra(scope: Scope, request_id: str | None) -> dict[str, Any]:
+    """Structured log fields shared by every reliability log record."""
+    return {"path": scope["path"], "method": scope["method"], "request_id": request_id}
+
+
+def _error_log_extra(scope: Scope, request_id: str | None) -> dict[str, Any]:
+    """
+    Structured log fields for an unhandled exception.
+
+    Query parameters are only copied out of the scope when DEBUG records are
+    emitted; at other levels the copy would be built just to be discarded.
+    """
+    extra = _log_extra(scope, request_id)
+    client = scope.get("client")
+    extra["client_host"] = client[0] if client else None
+    if logger.isEnabledFor(logging.DEBUG):
+        extra["query_params"] = dict(Request(scope).query_params)
+    return extra
+
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
+class RequestIDMiddleware:
     """
     Middleware to add request ID for distributed tracing.
 
@@ -40,35 +104,55 @@ class RequestIDMiddleware(BaseHTTPMiddleware):
     and metrics across services.
     """
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
+    _asgi_single_callable = True
+
+    def __init__(self, app: ASGIApp) -> None:
         """
-        Add request ID to request and response.
+        Initialize request ID middleware.
 
         Args:
-            request: FastAPI request
-            call_next: Next middleware/handler
+            app: Next ASGI application in the stack
+        """
+        self.app = app
 
-        Returns:
-            Response with request ID header
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Add request ID to request and response.
+
+        The ID is stored in the scope state, so handlers read it as
+        ``request.state.request_id``, bound to ``request_id_var`` for code
+        without the request at hand, and set as the X-Request-ID response
+        header.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Get or generate request ID
-        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
+        request_id = _request_id(scope)
 
         # Store in request state for access in handlers
-        request.state.request_id = request_id
-
-        # Call next middleware/handler
-        response = await call_next(request)
+        scope.setdefault("state", {})["request_id"] = request_id
+        token = request_id_var.set(request_id)
 
-        # Add request ID to response headers
-        response.headers["X-Request-ID"] = request_id
+        async def send_wrapper(message: Message) -> None:
+            # Add request ID to response headers
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
 
-        return response
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
 
 
-class TimeoutMiddleware(BaseHTTPMiddleware):
+class TimeoutMiddleware:
     """
     Middleware to enforce request timeouts.
 
@@ -76,112 +160,181 @@ class TimeoutMiddleware(BaseHTTPMiddleware):
     Without timeouts, a slow upstream service can cause cascading failures.
     """
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
+    _asgi_single_callable = True
+
+    def __init__(self, app: ASGIApp) -> None:
         """
-        Enforce timeout on request.
+        Initialize timeout middleware.
 
         Args:
-            request: FastAPI request
-            call_next: Next middleware/handler
+            app: Next ASGI application in the stack
+        """
+        self.app = app
 
-        Returns:
-            Response or 504 Gateway Timeout if timeout exceeded
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
-        try:
-            # Use configured timeout
-            timeout = settings.http_timeout
+        Enforce timeout on request.
+
+        Responds 504 Gateway Timeout if the timeout expires before the
+        response has started; otherwise the response is cut short.
 
-            response = await asyncio.wait_for(call_next(request), timeout=timeout)
-            return response
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        except asyncio.TimeoutError:
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        # Use configured timeout
+        timeout = settings.http_timeout
+
+        try:
+            async with asyncio.timeout(timeout):
+                await self.app(scope, receive, send_wrapper)
+
+        except TimeoutError:
+            request_id = request_id_var.get()
             logger.warning(
-                f"Request timeout after {settings.http_timeout}s",
-                extra={
-                    "path": request.url.path,
-                    "method": request.method,
-                    "request_id": getattr(request.state, "request_id", None),
-                },
+                "Request timeout after %ss", timeout, extra=_log_extra(scope, request_id)
             )
 
-            return JSONResponse(
-                status_code=504,
-                content={
-                    "error": "Gateway Timeout",
-                    "message": f"Request exceeded {settings.http_timeout}s timeout",
-                    "request_id": getattr(request.state, "request_id", None),
-                },
-            )
+            if not response_started:
+                response = JSONResponse(
+                    status_code=504,
+                    content={
+                        "error": "Gateway Timeout",
+                        "message": f"Request exceeded {timeout}s timeout",
+                        "request_id": request_id,
+                    },
+                )
+                await response(scope, receive, send)
 
 
-class MetricsMiddleware(BaseHTTPMiddleware):
+class MetricsMiddleware:
     """
     Middleware to collect HTTP metrics.
 
     DDIA Chapter 1: Metrics are essential for understanding system behavior.
     This middleware collects RED metrics (Rate, Errors, Duration).
+
+    Implemented as a pure ASGI middleware rather than BaseHTTPMiddleware:
+    it only needs to observe the response status, so wrapping ``send`` avoids
+    the extra task and stream plumbing BaseHTTPMiddleware adds per request.
     """
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
+    # Tells asgiref (used by the OpenTelemetry middleware) this is an ASGI3
+    # app; it cannot detect a mypyc-compiled __call__ as a coroutine function
+    _asgi_single_callable = True
+
+    def __init__(self, app: ASGIApp, bypass_paths: frozenset[str] = BYPASS_PATHS) -> None:
         """
-        Collect metrics for request.
+        Initialize metrics middleware.
 
         Args:
-            request: FastAPI request
-            call_next: Next middleware/handler
+            app: Next ASGI application in the stack
+            bypass_paths: Exact paths passed straight through without metrics
+        """
+        self.app = app
+        self.bypass_paths = bypass_paths
+        # Raw path -> route template, for paths that are themselves a static route
+        self._static_templates: dict[str, str] = {}
 
-        Returns:
-            Response with metrics recorded
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
-        # Normalize endpoint path (remove IDs, etc.)
-        endpoint = self._normalize_path(request.url.path)
-        method = request.method
+        Collect metrics for request.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] != "http" or scope["path"] in self.bypass_paths:
+            await self.app(scope, receive, send)
+            return
+
+        # Label by route template so cardinality is bounded by the route table
+        endpoint = self._route_template(scope)
+        method = scope["method"]
 
         # Track in-progress requests
-        http_requests_in_progress.labels(method=method, endpoint=endpoint).inc()
+        key = (method, endpoint)
+        http_requests_in_progress[key] += 1
+
+        status = "error"
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = STATUS_CLASS.get(message["status"], "error")
+            await send(message)
 
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         try:
-            response = await call_next(request)
-            status = response.status_code
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             # Record error
-            http_requests_total.labels(
-                method=method, endpoint=endpoint, status="error"
-            ).inc()
-            http_requests_in_progress.labels(method=method, endpoint=endpoint).dec()
+            status = "error"
 
             logger.error(
-                f"Request failed: {type(e).__name__}",
-                extra={
-                    "path": request.url.path,
-                    "method": method,
-                    "request_id": getattr(request.state, "request_id", None),
-                },
+                "Request failed: %s",
+                type(e).__name__,
+                extra=_log_extra(scope, request_id_var.get()),
                 exc_info=e,
             )
             raise
-
         finally:
             # Record metrics
-            duration = time.time() - start_time
+            record_request(method, endpoint, status, time.perf_counter() - start_time)
+            http_requests_in_progress[key] -= 1
 
-            http_requests_total.labels(
-                method=method, endpoint=endpoint, status=status
-            ).inc()
+    def _route_template(self, scope: Scope) -> str:
+        """
+        Resolve the route template (e.g. ``/users/{user_id}``) for a request.
 
-            http_request_duration_seconds.labels(
-                method=method, endpoint=endpoint
-            ).observe(duration)
+        Starlette only records the matched endpoint in the scope, not the
+        route, so the application's routes are matched here. Paths that are
+        themselves a static route are memoized. Requests that match no route
+        are labeled "unmatched"; outside a Starlette app the normalized path
+        is used instead.
 
-            http_requests_in_progress.labels(method=method, endpoint=endpoint).dec()
+        Args:
+            scope: ASGI connection scope
 
-        return response
+        Returns:
+            Route template to use as the endpoint label
+        """
+        path = scope["path"]
+        template = self._static_templates.get(path)
+        if template is not None:
+            return template
+
+        routes = getattr(scope.get("app"), "routes", None)
+        if routes is None:
+            return _normalize_path(path)
+
+        partial: str | None = None
+        for route in routes:
+            match, _ = route.matches(scope)
+            if match is Match.FULL:
+                template = route.path or "/"
+                if template == path:
+                    self._static_templates[path] = template
+                return template
+            if match is Match.PARTIAL and partial is None:
+                partial = route.path or "/"
+
+        return partial or "unmatched"
 
     @staticmethod
     def _normalize_path(path: str) -> str:
@@ -196,27 +349,53 @@ class MetricsMiddleware(BaseHTTPMiddleware):
         Returns:
             Normalized path
         """
-        # Remove trailing slashes
-        path = path.rstrip("/")
+        return _normalize_path(path)
+
 
-        # Replace UUIDs and numeric IDs with placeholders
-        import re
+class MetricsEndpointMiddleware:
+    """
+    Serve the Prometheus scrape endpoint ahead of all other middleware.
 
-        # UUID pattern
-        path = re.sub(
-            r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}",
-            "{id}",
-            path,
-            flags=re.IGNORECASE,
-        )
+    Registered as the outermost user middleware, it hands requests for
+    ``path`` straight to the metrics ASGI app, so scrapes skip CORS, GZip,
+    request ID, timeout and error handling, and are not counted in the HTTP
+    metrics they report.
+    """
 
-        # Numeric IDs
-        path = re.sub(r"/\d+", "/{id}", path)
+    _asgi_single_callable = True
 
-        return path or "/"
+    def __init__(self, app: ASGIApp, metrics_app: ASGIApp, path: str = "/metrics") -> None:
+        """
+        Initialize metrics endpoint middleware.
 
+        Args:
+            app: Next ASGI application in the stack
+            metrics_app: ASGI app serving the Prometheus exposition
+            path: Path the metrics app is served on
+        """
+        self.app = app
+        self.metrics_app = metrics_app
+        self.path = path.rstrip("/")
+        self.prefix = self.path + "/"
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Dispatch scrapes to the metrics app and everything else down the stack.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] == "http":
+            path = scope["path"]
+            if path == self.path or path.startswith(self.prefix):
+                await self.metrics_app(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class ErrorHandlingMiddleware:
     """
     Middleware for structured error handling and logging.
 
@@ -224,101 +403,269 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
     This middleware ensures all errors are logged with full context.
     """
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
+    _asgi_single_callable = True
+
+    def __init__(self, app: ASGIApp) -> None:
         """
-        Handle errors with structured logging.
+        Initialize error handling middleware.
 
         Args:
-            request: FastAPI request
-            call_next: Next middleware/handler
+            app: Next ASGI application in the stack
+        """
+        self.app = app
 
-        Returns:
-            Response or error response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Handle errors with structured logging.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send_wrapper)
 
         except Exception as exc:
             # Log with full context
+            request_id = request_id_var.get()
             logger.error(
-                f"Unhandled exception: {type(exc).__name__}",
-                extra={
-                    "path": request.url.path,
-                    "method": request.method,
-                    "query_params": dict(request.query_params),
-                    "request_id": getattr(request.state, "request_id", None),
-                    "client_host": request.client.host if request.client else None,
-                },
+                "Unhandled exception: %s",
+                type(exc).__name__,
+                extra=_error_log_extra(scope, request_id),
                 exc_info=exc,
             )
 
+            # A response already under way cannot be replaced
+            if response_started:
+                raise
+
             # Return error response
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=500,
                 content={
                     "error": "Internal Server Error",
                     "message": str(exc) if settings.debug else "An error occurred",
-                    "request_id": getattr(request.state, "request_id", None),
+                    "request_id": request_id,
                 },
             )
+            await response(scope, receive, send)
 
 
-class LoadSheddingMiddleware(BaseHTTPMiddleware):
+class LoadSheddingMiddleware:
     """
     Middleware for load shedding under high load.
 
     DDIA Chapter 1: Load shedding is a critical pattern for preventing
     cascading failures. When the system is overloaded, reject requests
     early to preserve resources for critical operations.
+
+    The limit applies to one worker process; it is not shared between
+    workers. Pass the per-worker share of the deployment's budget
+    (``Settings.max_concurrent_requests_per_worker``).
     """
 
-    def __init__(self, app, max_concurrent_requests: int = 1000):
+    _asgi_single_callable = True
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_concurrent_requests: int = 1000,
+        bypass_paths: frozenset[str] = BYPASS_PATHS,
+    ) -> None:
         """
         Initialize load shedding middleware.
 
         Args:
-            app: FastAPI app
+            app: Next ASGI application in the stack
             max_concurrent_requests: Maximum concurrent requests
+            bypass_paths: Exact paths that are never shed or counted
         """
-        super().__init__(app)
+        self.app = app
         self.max_concurrent_requests = max_concurrent_requests
-        self.current_requests = 0
+        self.bypass_paths = bypass_paths
+        # One permit per in-flight request. Checking locked() and acquiring
+        # happen without an await in between, so admission cannot race.
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Shed load if too many concurrent requests.
 
         Args:
-            request: FastAPI request
-            call_next: Next middleware/handler
-
-        Returns:
-            Response or 429 Too Many Requests
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
-        if self.current_requests >= self.max_concurrent_requests:
+        if scope["type"] != "http" or scope["path"] in self.bypass_paths:
+            await self.app(scope, receive, send)
+            return
+
+        if self._semaphore.locked():
             logger.warning(
-                f"Load shedding: rejecting request, {self.current_requests} concurrent requests"
+                "Load shedding: rejecting request, %d concurrent requests",
+                self.max_concurrent_requests,
             )
 
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=429,
                 content={
                     "error": "Too Many Requests",
                     "message": "Server is overloaded, please retry later",
-                    "request_id": getattr(request.state, "request_id", None),
+                    "request_id": request_id_var.get(),
                 },
             )
+            await response(scope, receive, send)
+            return
 
-        self.current_requests += 1
-
+        # A free permit is taken without suspending
+        await self._semaphore.acquire()
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send)
         finally:
-            self.current_requests -= 1
+            self._semaphore.release()
+
+
+class FusedReliabilityMiddleware(MetricsMiddleware):
+    """
+    Request ID, load shedding, timeout, metrics and error handling in one layer.
+
+    Behaves like RequestIDMiddleware, TimeoutMiddleware, MetricsMiddleware,
+    ErrorHandlingMiddleware and LoadSheddingMiddleware stacked in that order,
+    but as a single pure ASGI middleware: one coroutine frame per request
+    instead of five, and no BaseHTTPMiddleware task and stream per layer.
+    The timeout uses ``asyncio.timeout`` so no extra task is spawned either.
 
+    Requests to ``bypass_paths`` skip all of it and go straight to the app.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_concurrent_requests: int = 1000,
+        bypass_paths: frozenset[str] = BYPASS_PATHS,
+    ) -> None:
+        """
+        Initialize fused reliability middleware.
+
+        Args:
+            app: Next ASGI application in the stack
+            max_concurrent_requests: Maximum concurrent requests before shedding
+            bypass_paths: Exact paths passed straight through
+        """
+        super().__init__(app, bypass_paths)
+        self.max_concurrent_requests = max_concurrent_requests
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Run a request through all reliability concerns.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] != "http" or scope["path"] in self.bypass_paths:
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _request_id(scope)
+        scope.setdefault("state", {})["request_id"] = request_id
+        token = request_id_var.set(request_id)
+
+        endpoint = self._route_template(scope)
+        method = scope["method"]
+        key = (method, endpoint)
+        http_requests_in_progress[key] += 1
+
+        status = "error"
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, response_started
+            if message["type"] == "http.response.start":
+                status = STATUS_CLASS.get(message["status"], "error")
+                response_started = True
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        start_time = time.perf_counter()
+        timeout = settings.http_timeout
+
+        try:
+            if self._semaphore.locked():
+                logger.warning(
+                    "Load shedding: rejecting request, %d concurrent requests",
+                    self.max_concurrent_requests,
+                )
+                response = JSONResponse(
+                    status_code=429,
+                    content={
+                        "error": "Too Many Requests",
+                        "message": "Server is overloaded, please retry later",
+                        "request_id": request_id,
+                    },
+                )
+                await response(scope, receive, send_wrapper)
+            else:
+                await self._semaphore.acquire()
+                try:
+                    async with asyncio.timeout(timeout):
+                        await self.app(scope, receive, send_wrapper)
+                finally:
+                    self._semaphore.release()
+
+        except TimeoutError:
+            logger.warning(
+                "Request timeout after %ss", timeout, extra=_log_extra(scope, request_id)
+            )
+            if response_started:
+                status = "error"
+            else:
+                response = JSONResponse(
+                    status_code=504,
+                    content={
+                        "error": "Gateway Timeout",
+                        "message": f"Request exceeded {timeout}s timeout",
+                        "request_id": request_id,
+                    },
+                )
+                await response(scope, receive, send_wrapper)
+
+        except Exception as exc:
+            logger.error(
+                "Unhandled exception: %s",
+                type(exc).__name__,
+                extra=_error_log_extra(scope, request_id),
+                exc_info=exc,
+            )
+            if response_started:
+                status = "error"
+                raise
+            response = JSONResponse(
+                status_code=500,
+                content={
+                    "error": "Internal Server Error",
+                    "message": str(exc) if settings.debug else "An error occurred",
+                    "request_id": request_id,
+                },
+            )
+            await response(scope, receive, send_wrapper)
+
+        finally:
+            record_request(method, endpoint, status, time.perf_counter() - start_time)
+            http_requests_in_progress[key] -= 1
+            request_id_var.reset(token)
@@ -14,21 +14,26 @@ Reference: DDIA Chapter 1 - Reliable, Scalable, Maintainable Applications
 from atlas_api.reliability.circuit_breaker import (
     CircuitBreaker,
     CircuitBreakerConfig,
+    CircuitOpenError,
     CircuitState,
 )
 from atlas_api.reliability.retry import RetryConfig, retry_async, retry_sync
+from atlas_api.reliability.sliding_window import ErrorBudgetTracker
 from atlas_api.reliability.slo import (
     ATLAS_API_SLO,
     CRITICAL_ENDPOINT_SLO,
     NON_CRITICAL_ENDPOINT_SLO,
     AvailabilitySLI,
     ErrorRateSLI,
+    LatencyHistogram,
     LatencySLI,
     SLIType,
     ServiceLevelObjective,
     ThroughputSLI,
     format_slo_summary,
+    get_latency_histogram,
     get_slo_for_endpoint,
+    record_latency_us,
 )
 
 __all__ = [
@@ -44,6 +49,10 @@ __all__ = [
     "NON_CRITICAL_ENDPOINT_SLO",
     "get_slo_for_endpoint",
     "format_slo_summary",
+    "LatencyHistogram",
+    "get_latency_histogram",
+    "record_latency_us",
+    "ErrorBudgetTracker",
     # Retry
     "RetryConfig",
     "retry_sync",
@@ -51,6 +60,7 @@ __all__ = [
     # Circuit Breaker
     "CircuitBreaker",
     "CircuitBreakerConfig",
+    "CircuitOpenError",
     "CircuitState",
 ]
 
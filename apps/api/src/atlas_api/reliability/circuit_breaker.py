@@ -4,12 +4,16 @@ Circuit breaker pattern implementation.
 Implements DDIA Chapter 1 principles for preventing cascading failures.
 Circuit breaker stops calling a failing service to allow it to recover.
 
+Compiled by ``make compile`` along with retry.py. mypyc cannot yet compile
+str- or int-mixin enums, so CircuitState is a plain Enum.
+
 Reference: DDIA Chapter 1 - Reliability, Cascading Failures
 """
 
 import asyncio
 import logging
 import time
+from collections import deque
 from enum import Enum
 from typing import Any, Awaitable, Callable, Optional, TypeVar
 
@@ -23,18 +27,25 @@ logger = logging.getLogger(__name__)
 T = TypeVar("T")
 
 
-class CircuitState(str, Enum):
+class CircuitState(Enum):
     """Circuit breaker states.
 
     DDIA Chapter 1: Circuit breaker has three states:
     - CLOSED: Normal operation, requests pass through
     - OPEN: Service is failing, requests are rejected immediately
     - HALF_OPEN: Testing if service has recovered
+
+    Values are the circuit_breaker_state gauge values; get_status() reports
+    the lowercased name.
     """
 
-    CLOSED = "closed"  # Normal operation
-    OPEN = "open"  # Service failing, reject requests
-    HALF_OPEN = "half_open"  # Testing recovery
+    CLOSED = 0  # Normal operation
+    OPEN = 1  # Service failing, reject requests
+    HALF_OPEN = 2  # Testing recovery
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is OPEN."""
 
 
 class CircuitBreakerConfig:
@@ -45,6 +56,8 @@ class CircuitBreakerConfig:
         failure_threshold: int = 5,
         recovery_timeout_seconds: int = 60,
         success_threshold: int = 2,
+        slow_call_threshold_ms: Optional[float] = None,
+        slow_call_window: int = 10,
     ):
         """
         Initialize circuit breaker configuration.
@@ -53,6 +66,9 @@ class CircuitBreakerConfig:
             failure_threshold: Number of failures before opening circuit
             recovery_timeout_seconds: Seconds before attempting recovery
             success_threshold: Number of successes in half-open before closing
+            slow_call_threshold_ms: Average latency over the last slow_call_window
+                successful calls that opens the circuit (None disables)
+            slow_call_window: Number of recent calls averaged for slow-call tripping
         """
         if failure_threshold < 1:
             raise ValueError("failure_threshold must be >= 1")
@@ -60,10 +76,16 @@ class CircuitBreakerConfig:
             raise ValueError("recovery_timeout_seconds must be >= 1")
         if success_threshold < 1:
             raise ValueError("success_threshold must be >= 1")
+        if slow_call_threshold_ms is not None and slow_call_threshold_ms <= 0:
+            raise ValueError("slow_call_threshold_ms must be > 0")
+        if slow_call_window < 1:
+            raise ValueError("slow_call_window must be >= 1")
 
         self.failure_threshold = failure_threshold
         self.recovery_timeout_seconds = recovery_timeout_seconds
         self.success_threshold = success_threshold
+        self.slow_call_threshold_ms = slow_call_threshold_ms
+        self.slow_call_window = slow_call_window
 
 
 class CircuitBreaker:
@@ -98,34 +120,159 @@ class CircuitBreaker:
         self.config = config or CircuitBreakerConfig()
         self.exceptions = exceptions
 
-        self.state = CircuitState.CLOSED
-        self.failure_count = 0
-        self.success_count = 0
+        self.state: CircuitState = CircuitState.CLOSED
+        self.failure_count: int = 0
+        self.success_count: int = 0
+        # Wall-clock time of the last failure, for status reporting
         self.last_failure_time: Optional[float] = None
+        # Monotonic time the circuit opened; only compared against itself
         self.opened_at: Optional[float] = None
+        # Monotonic deadline before which an OPEN circuit rejects calls
+        self._open_until: float = 0.0
+        # Latencies (ms) of recent successful calls while CLOSED
+        self._latencies: deque[float] = deque(maxlen=self.config.slow_call_window)
+
+        # Raised for every rejected call, so the reject path allocates nothing
+        self._open_error = CircuitOpenError(
+            f"Circuit breaker {name} is OPEN. Service is unavailable."
+        )
+
+        # Metric children for this service, bound once
+        self._state_gauge = circuit_breaker_state.labels(service=self.name)
+        self._failures_counter = circuit_breaker_failures_total.labels(service=self.name)
 
         # Update metrics
         self._update_metrics()
 
     def _update_metrics(self) -> None:
         """Update Prometheus metrics."""
-        state_value = {
-            CircuitState.CLOSED: 0,
-            CircuitState.OPEN: 1,
-            CircuitState.HALF_OPEN: 2,
-        }[self.state]
-        circuit_breaker_state.labels(service=self.name).set(state_value)
+        self._state_gauge.set(self.state.value)
 
     def _should_attempt_reset(self) -> bool:
         """Check if enough time has passed to attempt recovery."""
+        return self.state == CircuitState.OPEN and time.monotonic() >= self._open_until
+
+    def _trip(self) -> None:
+        """Open the circuit and start the recovery timeout."""
+        self.state = CircuitState.OPEN
+        self.opened_at = time.monotonic()
+        self._open_until = self.opened_at + self.config.recovery_timeout_seconds
+        self._update_metrics()
+
+    def reset(self) -> None:
+        """Return to CLOSED with no recorded failures, successes or latencies."""
+        self.state = CircuitState.CLOSED
+        self.failure_count = 0
+        self.success_count = 0
+        self.last_failure_time = None
+        self.opened_at = None
+        self._open_until = 0.0
+        self._latencies.clear()
+        self._update_metrics()
+
+    def _record_latency(self, elapsed_ms: float) -> None:
+        """
+        Track a successful call's latency and open the circuit if the service is slow.
+
+        Catches a degraded dependency before its calls start timing out.
+
+        Args:
+            elapsed_ms: Call duration in milliseconds
+        """
+        threshold = self.config.slow_call_threshold_ms
+        if threshold is None or self.state != CircuitState.CLOSED:
+            return
+
+        latencies = self._latencies
+        latencies.append(elapsed_ms)
+        window = self.config.slow_call_window
+        if len(latencies) < window:
+            return
+
+        avg_ms = sum(latencies) / len(latencies)
+        if avg_ms > threshold:
+            latencies.clear()
+            self._trip()
+            logger.error(
+                "Circuit breaker %s opened: average latency %.1fms "
+                "over last %d calls exceeds %sms",
+                self.name,
+                avg_ms,
+                window,
+                threshold,
+            )
+
+    def _pre_call(self) -> None:
+        """
+        Move to HALF_OPEN once the recovery timeout has passed, or reject the call.
+
+        Raises:
+            CircuitOpenError: If circuit is open
+        """
         if self.state != CircuitState.OPEN:
-            return False
+            return
 
-        if self.opened_at is None:
-            return False
+        # Reject immediately until the recovery timeout has passed
+        if time.monotonic() < self._open_until:
+            # Drop the previous rejection's traceback so it doesn't keep growing
+            raise self._open_error.with_traceback(None)
 
-        elapsed = time.time() - self.opened_at
-        return elapsed >= self.config.recovery_timeout_seconds
+        # Attempt recovery
+        self.state = CircuitState.HALF_OPEN
+        self.success_count = 0
+        self._update_metrics()
+        logger.info("Circuit breaker %s entering HALF_OPEN state", self.name)
+
+    def _on_success(self, start: float) -> None:
+        """
+        Record a successful call.
+
+        Args:
+            start: perf_counter() value taken just before the call
+        """
+        if self.state == CircuitState.HALF_OPEN:
+            self.success_count += 1
+            if self.success_count >= self.config.success_threshold:
+                self.state = CircuitState.CLOSED
+                self.failure_count = 0
+                self._latencies.clear()
+                self._update_metrics()
+                logger.info("Circuit breaker %s recovered, entering CLOSED state", self.name)
+        elif self.state == CircuitState.CLOSED:
+            # Reset failure count on success
+            self.failure_count = 0
+            self._record_latency((time.perf_counter() - start) * 1000)
+
+    def _on_failure(self, exc: Exception) -> None:
+        """
+        Record a failed call and open the circuit once the threshold is reached.
+
+        Args:
+            exc: Exception raised by the call
+        """
+        self.failure_count += 1
+        self.last_failure_time = time.time()
+        self._failures_counter.inc()
+
+        logger.warning(
+            "Circuit breaker %s failure %d/%d: %s: %s",
+            self.name,
+            self.failure_count,
+            self.config.failure_threshold,
+            type(exc).__name__,
+            exc,
+        )
+
+        # Open circuit if threshold reached. Calls that were already in
+        # flight when it opened fail here too; they must not reopen it
+        # (restarting the recovery timeout) or repeat the transition.
+        # Nothing awaits between this check and the write, so no lock is
+        # needed on the event loop.
+        if self.failure_count >= self.config.failure_threshold and self.state != CircuitState.OPEN:
+            self._trip()
+            logger.error(
+                "Circuit breaker %s opened after %d failures", self.name, self.failure_count
+            )
 
     def call_sync(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
         """
@@ -140,61 +287,18 @@ class CircuitBreaker:
             Result of function call
 
         Raises:
-            Exception: If circuit is open or function fails
+            CircuitOpenError: If circuit is open
+            Exception: If function fails
         """
-        # Check if we should attempt recovery
-        if self._should_attempt_reset():
-            self.state = CircuitState.HALF_OPEN
-            self.success_count = 0
-            self._update_metrics()
-            logger.info(f"Circuit breaker {self.name} entering HALF_OPEN state")
-
-        # If circuit is open, reject immediately
-        if self.state == CircuitState.OPEN:
-            raise Exception(
-                f"Circuit breaker {self.name} is OPEN. Service is unavailable."
-            )
-
+        self._pre_call()
+        start = time.perf_counter()
         try:
             result = func(*args, **kwargs)
-
-            # Success
-            if self.state == CircuitState.HALF_OPEN:
-                self.success_count += 1
-                if self.success_count >= self.config.success_threshold:
-                    self.state = CircuitState.CLOSED
-                    self.failure_count = 0
-                    self._update_metrics()
-                    logger.info(
-                        f"Circuit breaker {self.name} recovered, entering CLOSED state"
-                    )
-            elif self.state == CircuitState.CLOSED:
-                # Reset failure count on success
-                self.failure_count = 0
-
-            return result
-
         except self.exceptions as e:
-            # Failure
-            self.failure_count += 1
-            self.last_failure_time = time.time()
-            circuit_breaker_failures_total.labels(service=self.name).inc()
-
-            logger.warning(
-                f"Circuit breaker {self.name} failure {self.failure_count}/{self.config.failure_threshold}: "
-                f"{type(e).__name__}: {str(e)}"
-            )
-
-            # Open circuit if threshold reached
-            if self.failure_count >= self.config.failure_threshold:
-                self.state = CircuitState.OPEN
-                self.opened_at = time.time()
-                self._update_metrics()
-                logger.error(
-                    f"Circuit breaker {self.name} opened after {self.failure_count} failures"
-                )
-
+            self._on_failure(e)
             raise
+        self._on_success(start)
+        return result
 
     async def call_async(
         self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any
@@ -211,70 +315,31 @@ class CircuitBreaker:
             Result of function call
 
         Raises:
-            Exception: If circuit is open or function fails
+            CircuitOpenError: If circuit is open
+            Exception: If function fails
         """
-        # Check if we should attempt recovery
-        if self._should_attempt_reset():
-            self.state = CircuitState.HALF_OPEN
-            self.success_count = 0
-            self._update_metrics()
-            logger.info(f"Circuit breaker {self.name} entering HALF_OPEN state")
-
-        # If circuit is open, reject immediately
-        if self.state == CircuitState.OPEN:
-            raise Exception(
-                f"Circuit breaker {self.name} is OPEN. Service is unavailable."
-            )
-
+        self._pre_call()
+        start = time.perf_counter()
         try:
             result = await func(*args, **kwargs)
-
-            # Success
-            if self.state == CircuitState.HALF_OPEN:
-                self.success_count += 1
-                if self.success_count >= self.config.success_threshold:
-                    self.state = CircuitState.CLOSED
-                    self.failure_count = 0
-                    self._update_metrics()
-                    logger.info(
-                        f"Circuit breaker {self.name} recovered, entering CLOSED state"
-                    )
-            elif self.state == CircuitState.CLOSED:
-                # Reset failure count on success
-                self.failure_count = 0
-
-            return result
-
         except self.exceptions as e:
-            # Failure
-            self.failure_count += 1
-            self.last_failure_time = time.time()
-            circuit_breaker_failures_total.labels(service=self.name).inc()
-
-            logger.warning(
-                f"Circuit breaker {self.name} failure {self.failure_count}/{self.config.failure_threshold}: "
-                f"{type(e).__name__}: {str(e)}"
-            )
-
-            # Open circuit if threshold reached
-            if self.failure_count >= self.config.failure_threshold:
-                self.state = CircuitState.OPEN
-                self.opened_at = time.time()
-                self._update_metrics()
-                logger.error(
-                    f"Circuit breaker {self.name} opened after {self.failure_count} failures"
-                )
-
+            self._on_failure(e)
             raise
+        self._on_success(start)
+        return result
 
     def get_status(self) -> dict[str, Any]:
         """Get circuit breaker status."""
+        opened_at = None
+        if self.opened_at is not None:
+            # Report as wall-clock time
+            opened_at = time.time() - (time.monotonic() - self.opened_at)
         return {
             "name": self.name,
-            "state": self.state.value,
+            "state": self.state.name.lower(),
             "failure_count": self.failure_count,
             "success_count": self.success_count,
             "last_failure_time": self.last_failure_time,
-            "opened_at": self.opened_at,
+            "opened_at": opened_at,
         }
 
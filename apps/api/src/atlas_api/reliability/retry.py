@@ -5,6 +5,8 @@ Implements DDIA Chapter 1 principles for handling transient failures.
 Exponential backoff prevents overwhelming a struggling service.
 Jitter prevents thundering herd problem.
 
+Part of the mypyc build (``make compile``), so annotate any new attributes.
+
 Reference: DDIA Chapter 1 - Reliability
 """
 
@@ -15,7 +17,7 @@ import time
 from functools import wraps
 from typing import Any, Awaitable, Callable, Optional, TypeVar
 
-from atlas_api.instrumentation.metrics import retry_attempts_total
+from atlas_api.instrumentation.metrics import bind_retry_counters
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +63,21 @@ class RetryConfig:
         self.max_delay_ms = max_delay_ms
         self.multiplier = multiplier
         self.jitter = jitter
+        # Capped exponential delay for every attempt, computed once
+        self._delays_ms = tuple(self._backoff_ms(attempt) for attempt in range(max_attempts))
+
+    def _backoff_ms(self, attempt: int) -> float:
+        """Capped exponential backoff for an attempt, before jitter."""
+        return min(self.base_delay_ms * (self.multiplier**attempt), self.max_delay_ms)
+
+    def schedule(self) -> list[int]:
+        """
+        Backoff delay after each attempt, before jitter.
+
+        Returns:
+            list[int]: Delay in milliseconds for attempts 0..max_attempts-1
+        """
+        return [int(delay) for delay in self._delays_ms]
 
     def calculate_delay_ms(self, attempt: int) -> int:
         """
@@ -77,17 +94,69 @@ class RetryConfig:
             int: Delay in milliseconds
         """
         # Exponential backoff
-        delay = self.base_delay_ms * (self.multiplier ** attempt)
-        delay = min(delay, self.max_delay_ms)
+        if attempt < len(self._delays_ms):
+            delay = self._delays_ms[attempt]
+        else:
+            delay = self._backoff_ms(attempt)
 
-        # Add jitter to prevent thundering herd
+        # Add jitter to prevent thundering herd (factor uniform in [0.5, 1.5))
         if self.jitter:
-            jitter_factor = random.uniform(0.5, 1.5)
-            delay = delay * jitter_factor
+            delay = delay * (0.5 + random.random())
 
         return int(delay)
 
 
+def _attempt_failed(
+    config: RetryConfig,
+    retry_counters: tuple[Any, ...],
+    name: str,
+    attempt: int,
+    exc: Exception,
+) -> Optional[int]:
+    """
+    Count and log a failed attempt; shared by retry_sync and retry_async.
+
+    Args:
+        config: Retry configuration of the decorator
+        retry_counters: Counter child for each attempt, from bind_retry_counters
+        name: Name of the retried function
+        attempt: 0-indexed attempt that failed
+        exc: Exception the attempt raised
+
+    Returns:
+        Optional[int]: Delay in milliseconds before the next attempt, or None
+            if no attempts remain
+    """
+    retry_counters[attempt].inc()
+
+    if attempt >= config.max_attempts - 1:
+        logger.error(
+            "All %d retry attempts failed for %s: %s: %s",
+            config.max_attempts,
+            name,
+            type(exc).__name__,
+            exc,
+        )
+        return None
+
+    delay_ms = config.calculate_delay_ms(attempt)
+    logger.warning(
+        "Retry %d/%d for %s: %s: %s. Waiting %dms before retry.",
+        attempt + 1,
+        config.max_attempts,
+        name,
+        type(exc).__name__,
+        exc,
+        delay_ms,
+    )
+    return delay_ms
+
+
+def _log_recovered(name: str, attempt: int) -> None:
+    """Log a call that succeeded on a retry (attempt > 0)."""
+    logger.info("Retry succeeded for %s on attempt %d", name, attempt + 1)
+
+
 def retry_sync(
     config: Optional[RetryConfig] = None,
     exceptions: tuple[type[Exception], ...] = (Exception,),
@@ -116,43 +185,28 @@ def retry_sync(
         config = RetryConfig()
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        # Labelled by the decorated function's name, as in the retry logs
+        retry_counters = bind_retry_counters(func.__name__, config.max_attempts)
+
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> T:
-            last_exception: Optional[Exception] = None
-
             for attempt in range(config.max_attempts):
                 try:
                     result = func(*args, **kwargs)
-                    if attempt > 0:
-                        logger.info(
-                            f"Retry succeeded for {func.__name__} on attempt {attempt + 1}"
-                        )
-                    return result
                 except exceptions as e:
-                    last_exception = e
-                    retry_attempts_total.labels(
-                        operation=func.__name__, attempt=attempt + 1
-                    ).inc()
-
-                    if attempt < config.max_attempts - 1:
-                        delay_ms = config.calculate_delay_ms(attempt)
-                        logger.warning(
-                            f"Retry {attempt + 1}/{config.max_attempts} for {func.__name__}: "
-                            f"{type(e).__name__}: {str(e)}. "
-                            f"Waiting {delay_ms}ms before retry."
-                        )
-
-                        if on_retry:
-                            on_retry(attempt + 1, e)
-
-                        time.sleep(delay_ms / 1000.0)
-                    else:
-                        logger.error(
-                            f"All {config.max_attempts} retry attempts failed for {func.__name__}: "
-                            f"{type(e).__name__}: {str(e)}"
-                        )
-
-            raise last_exception or Exception(f"Failed after {config.max_attempts} attempts")
+                    delay_ms = _attempt_failed(config, retry_counters, func.__name__, attempt, e)
+                    if delay_ms is None:
+                        raise
+                    if on_retry:
+                        on_retry(attempt + 1, e)
+                    time.sleep(delay_ms / 1000.0)
+                    continue
+                if attempt > 0:
+                    _log_recovered(func.__name__, attempt)
+                return result
+
+            # Unreachable: the last attempt either returns or re-raises
+            raise RuntimeError(f"Failed after {config.max_attempts} attempts")
 
         return wrapper
 
@@ -189,43 +243,28 @@ def retry_async(
     def decorator(
         func: Callable[..., Awaitable[T]],
     ) -> Callable[..., Awaitable[T]]:
+        # Labelled by the decorated function's name, as in the retry logs
+        retry_counters = bind_retry_counters(func.__name__, config.max_attempts)
+
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> T:
-            last_exception: Optional[Exception] = None
-
             for attempt in range(config.max_attempts):
                 try:
                     result = await func(*args, **kwargs)
-                    if attempt > 0:
-                        logger.info(
-                            f"Retry succeeded for {func.__name__} on attempt {attempt + 1}"
-                        )
-                    return result
                 except exceptions as e:
-                    last_exception = e
-                    retry_attempts_total.labels(
-                        operation=func.__name__, attempt=attempt + 1
-                    ).inc()
-
-                    if attempt < config.max_attempts - 1:
-                        delay_ms = config.calculate_delay_ms(attempt)
-                        logger.warning(
-                            f"Retry {attempt + 1}/{config.max_attempts} for {func.__name__}: "
-                            f"{type(e).__name__}: {str(e)}. "
-                            f"Waiting {delay_ms}ms before retry."
-                        )
-
-                        if on_retry:
-                            await on_retry(attempt + 1, e)
-
-                        await asyncio.sleep(delay_ms / 1000.0)
-                    else:
-                        logger.error(
-                            f"All {config.max_attempts} retry attempts failed for {func.__name__}: "
-                            f"{type(e).__name__}: {str(e)}"
-                        )
-
-            raise last_exception or Exception(f"Failed after {config.max_attempts} attempts")
+                    delay_ms = _attempt_failed(config, retry_counters, func.__name__, attempt, e)
+                    if delay_ms is None:
+                        raise
+                    if on_retry:
+                        await on_retry(attempt + 1, e)
+                    await asyncio.sleep(delay_ms / 1000.0)
+                    continue
+                if attempt > 0:
+                    _log_recovered(func.__name__, attempt)
+                return result
+
+            # Unreachable: the last attempt either returns or re-raises
+            raise RuntimeError(f"Failed after {config.max_attempts} attempts")
 
         return wrapper
 
@@ -0,0 +1,165 @@
+"""
+Sliding-window SLO evaluation.
+
+Tracks request outcomes over an SLO's evaluation window so the error rate,
+remaining error budget and tail latency can be read at any time.
+
+Samples are aggregated into fixed time buckets held in a ring. Every
+aggregate kept (request and error counts, latency histogram counts) is
+invertible, so an expiring bucket is subtracted from the running window
+totals instead of recomputing them: recording and querying cost the same
+regardless of how many requests the window holds, and memory grows with
+the number of buckets rather than the number of requests.
+
+Reference: DDIA Chapter 1 - Describing Performance
+"""
+
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from atlas_api.reliability.slo import LatencyHistogram, ServiceLevelObjective
+
+
+class _Bucket:
+    """Aggregates for one time slice of the window."""
+
+    __slots__ = ("index", "requests", "errors", "latencies")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.requests = 0
+        self.errors = 0
+        # Bucket-equivalent latency (us) -> occurrences, to expire from the
+        # window histogram; bounded by the histogram's bucket count
+        self.latencies: dict[int, int] = {}
+
+
+class ErrorBudgetTracker:
+    """
+    Rolling error-rate and latency evaluation for one SLO.
+
+    DDIA Chapter 1: Percentiles and error rates are only meaningful over a
+    window of recent requests; older requests must stop counting.
+    """
+
+    def __init__(
+        self,
+        slo: ServiceLevelObjective,
+        bucket_count: int = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize error budget tracker.
+
+        Args:
+            slo: ServiceLevelObjective whose window and targets are evaluated
+            bucket_count: Number of time buckets the window is divided into;
+                samples expire one bucket at a time
+            clock: Monotonic time source in seconds
+        """
+        if bucket_count < 1:
+            raise ValueError("bucket_count must be >= 1")
+
+        self.slo = slo
+        self.bucket_count = bucket_count
+        self.bucket_seconds = slo.window_minutes * 60 / bucket_count
+        self._clock = clock
+
+        self._buckets: deque[_Bucket] = deque()
+        self._requests = 0
+        self._errors = 0
+        self._latency = LatencyHistogram(significant_digits=2)
+
+    def _expire(self, now: Optional[float]) -> int:
+        """
+        Subtract buckets that have left the window from the running totals.
+
+        Returns:
+            int: Index of the bucket that now falls into
+        """
+        if now is None:
+            now = self._clock()
+        index = int(now // self.bucket_seconds)
+
+        buckets = self._buckets
+        oldest_kept = index - self.bucket_count + 1
+        while buckets and buckets[0].index < oldest_kept:
+            expired = buckets.popleft()
+            self._requests -= expired.requests
+            self._errors -= expired.errors
+            for value_us, count in expired.latencies.items():
+                self._latency.remove(value_us, count)
+        return index
+
+    def record(self, is_error: bool, latency_ms: float, now: Optional[float] = None) -> None:
+        """
+        Record one request outcome.
+
+        Args:
+            is_error: Whether the request counts against the error budget
+            latency_ms: Request latency in milliseconds
+            now: Event time from the tracker's clock (defaults to the current time)
+        """
+        index = self._expire(now)
+        buckets = self._buckets
+        # Late events are counted in the newest bucket so buckets stay ordered
+        if not buckets or buckets[-1].index < index:
+            buckets.append(_Bucket(index))
+        bucket = buckets[-1]
+        value_us = self._latency.highest_equivalent_value(int(latency_ms * 1000))
+
+        bucket.requests += 1
+        bucket.latencies[value_us] = bucket.latencies.get(value_us, 0) + 1
+        self._requests += 1
+        self._latency.record(value_us)
+        if is_error:
+            bucket.errors += 1
+            self._errors += 1
+
+    def request_count(self, now: Optional[float] = None) -> int:
+        """Number of requests in the window."""
+        self._expire(now)
+        return self._requests
+
+    def error_rate(self, now: Optional[float] = None) -> float:
+        """
+        Fraction of requests in the window that failed.
+
+        Returns:
+            float: Error rate (0.0 if the window is empty)
+        """
+        self._expire(now)
+        if self._requests == 0:
+            return 0.0
+        return self._errors / self._requests
+
+    def error_budget_remaining(self, now: Optional[float] = None) -> float:
+        """
+        Fraction of the SLO's error budget still unspent in the window.
+
+        Returns:
+            float: 1.0 with no errors, 0.0 at the SLO's max error rate, and
+            negative once the budget is overspent
+        """
+        max_error_rate = self.slo.error_rate.max_error_rate
+        if max_error_rate == 0.0:
+            return 1.0 if self.error_rate(now) == 0.0 else float("-inf")
+        return 1.0 - self.error_rate(now) / max_error_rate
+
+    def latency_percentile_ms(self, percentile: float, now: Optional[float] = None) -> float:
+        """
+        Latency at the given percentile over the window.
+
+        Args:
+            percentile: Percentile in [0, 100], e.g. 99.9
+
+        Returns:
+            float: Latency in milliseconds (0.0 if the window is empty)
+        """
+        self._expire(now)
+        return self._latency.value_at_percentile(percentile) / 1000
+
+    def p99_ms(self, now: Optional[float] = None) -> float:
+        """99th percentile latency over the window, in milliseconds."""
+        return self.latency_percentile_ms(99.0, now)
@@ -7,8 +7,10 @@ SLIs are measurable metrics, SLOs are targets for those metrics.
 Reference: DDIA Chapter 1 - Reliability, Scalability, Maintainability
 """
 
+import math
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 from typing import Optional
 
 
@@ -21,7 +23,7 @@ class SLIType(str, Enum):
     AVAILABILITY = "availability"  # Fraction of time service is available
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LatencySLI:
     """Latency SLI with percentile targets.
 
@@ -40,7 +42,7 @@ class LatencySLI:
             raise ValueError("Percentiles must be in ascending order")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ErrorRateSLI:
     """Error rate SLI.
 
@@ -59,7 +61,7 @@ class ErrorRateSLI:
             raise ValueError("5xx rate must be between 0.0 and 1.0")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ThroughputSLI:
     """Throughput SLI.
 
@@ -77,7 +79,7 @@ class ThroughputSLI:
             raise ValueError("Min RPS must be <= max RPS")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AvailabilitySLI:
     """Availability SLI.
 
@@ -92,7 +94,7 @@ class AvailabilitySLI:
             raise ValueError("Availability must be between 0.0 and 1.0")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ServiceLevelObjective:
     """Service Level Objective (SLO).
 
@@ -187,49 +189,48 @@ NON_CRITICAL_ENDPOINT_SLO = ServiceLevelObjective(
 )
 
 
+# Path segments that select a stricter or relaxed SLO. Critical segments take
+# precedence when a path contains both.
+_CRITICAL_SEGMENTS = frozenset({"health", "auth", "login", "payments", "transactions"})
+_NON_CRITICAL_SEGMENTS = frozenset({"analytics", "reports", "export", "batch"})
+
+
+@lru_cache(maxsize=4096)
 def get_slo_for_endpoint(endpoint: str) -> ServiceLevelObjective:
     """
     Get the appropriate SLO for an endpoint.
 
+    Matches whole path segments, so ``/api/v1/auth/token`` is critical but
+    ``/api/v1/authors`` is not. Results are memoized; the set of endpoints a
+    service sees is small.
+
     Args:
         endpoint: API endpoint path
 
     Returns:
         ServiceLevelObjective: The SLO for this endpoint
     """
+    segments = endpoint.split("/")
+
     # Critical endpoints
-    critical_patterns = [
-        "/health",
-        "/auth",
-        "/login",
-        "/payments",
-        "/transactions",
-    ]
-
-    for pattern in critical_patterns:
-        if pattern in endpoint:
-            return CRITICAL_ENDPOINT_SLO
+    if not _CRITICAL_SEGMENTS.isdisjoint(segments):
+        return CRITICAL_ENDPOINT_SLO
 
     # Non-critical endpoints
-    non_critical_patterns = [
-        "/analytics",
-        "/reports",
-        "/export",
-        "/batch",
-    ]
-
-    for pattern in non_critical_patterns:
-        if pattern in endpoint:
-            return NON_CRITICAL_ENDPOINT_SLO
+    if not _NON_CRITICAL_SEGMENTS.isdisjoint(segments):
+        return NON_CRITICAL_ENDPOINT_SLO
 
     # Default
     return ATLAS_API_SLO
 
 
+@lru_cache(maxsize=32)
 def format_slo_summary(slo: ServiceLevelObjective) -> str:
     """
     Format SLO as human-readable summary.
 
+    SLOs are immutable, so each summary is formatted once and memoized.
+
     Args:
         slo: ServiceLevelObjective to format
 
@@ -259,3 +260,189 @@ Availability Target:
   Min Availability: {slo.availability.min_availability * 100:.2f}%
 """
 
+
+class LatencyHistogram:
+    """
+    Bounded-memory latency histogram for evaluating LatencySLI percentiles.
+
+    Uses HdrHistogram's log-linear bucketing: values below the sub-bucket
+    count are exact, and each power of two above that is split into the same
+    number of linear sub-buckets, giving a fixed relative error. Recording is
+    O(1), memory is fixed by the value range and precision rather than the
+    number of samples, and histograms with the same layout merge by summing
+    bucket counts, so per-worker histograms can be combined without shipping
+    raw samples.
+    """
+
+    __slots__ = ("max_value_us", "_sub_bits", "_sub_count", "_half_count", "_counts", "_total")
+
+    max_value_us: int
+    _sub_bits: int
+    _sub_count: int
+    _half_count: int
+    _counts: list[int]
+    _total: int
+
+    def __init__(self, max_value_us: int = 60_000_000, significant_digits: int = 3):
+        """
+        Initialize latency histogram.
+
+        Args:
+            max_value_us: Largest trackable latency in microseconds; larger
+                values are recorded as this value
+            significant_digits: Decimal digits of precision kept (1-5)
+        """
+        if max_value_us < 1:
+            raise ValueError("max_value_us must be >= 1")
+        if not (1 <= significant_digits <= 5):
+            raise ValueError("significant_digits must be between 1 and 5")
+
+        self.max_value_us = max_value_us
+        # Smallest power of two with 2 * 10^digits sub-buckets
+        self._sub_bits = (2 * 10**significant_digits - 1).bit_length()
+        self._sub_count = 1 << self._sub_bits
+        self._half_count = self._sub_count >> 1
+        self._counts = [0] * (self._index(max_value_us) + 1)
+        self._total = 0
+
+    def _index(self, value: int) -> int:
+        """Bucket index for a non-negative value."""
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self._sub_bits
+        sub_bucket = value >> shift
+        return self._sub_count + (shift - 1) * self._half_count + sub_bucket - self._half_count
+
+    def _highest_equivalent(self, index: int) -> int:
+        """Largest value that falls into a bucket."""
+        if index < self._sub_count:
+            return index
+        offset = index - self._sub_count
+        shift = offset // self._half_count + 1
+        sub_bucket = offset % self._half_count + self._half_count
+        return ((sub_bucket + 1) << shift) - 1
+
+    @property
+    def total_count(self) -> int:
+        """Number of recorded values."""
+        return self._total
+
+    def _clamp(self, value_us: int) -> int:
+        """Clamp a value to the trackable range."""
+        if value_us < 0:
+            return 0
+        if value_us > self.max_value_us:
+            return self.max_value_us
+        return value_us
+
+    def highest_equivalent_value(self, value_us: int) -> int:
+        """
+        Largest value recorded into the same bucket as value_us.
+
+        Args:
+            value_us: Latency in microseconds
+
+        Returns:
+            int: Representative value that loses no precision when recorded
+        """
+        value_us = self._clamp(value_us)
+        return min(self._highest_equivalent(self._index(value_us)), self.max_value_us)
+
+    def record(self, value_us: int, count: int = 1) -> None:
+        """
+        Record a latency.
+
+        Args:
+            value_us: Latency in microseconds (clamped to [0, max_value_us])
+            count: Number of occurrences to record
+        """
+        self._counts[self._index(self._clamp(value_us))] += count
+        self._total += count
+
+    def remove(self, value_us: int, count: int = 1) -> None:
+        """
+        Remove previously recorded occurrences of a latency.
+
+        Used by sliding windows to expire old samples without rebuilding.
+
+        Args:
+            value_us: Latency in microseconds, as passed to record()
+            count: Number of occurrences to remove
+        """
+        self._counts[self._index(self._clamp(value_us))] -= count
+        self._total -= count
+
+    def value_at_percentile(self, percentile: float) -> int:
+        """
+        Latency at or below which the given percentage of values fall.
+
+        Args:
+            percentile: Percentile in [0, 100], e.g. 99.9
+
+        Returns:
+            int: Highest value equivalent to the percentile's bucket, in
+            microseconds (0 if nothing has been recorded)
+        """
+        if not (0.0 <= percentile <= 100.0):
+            raise ValueError("percentile must be between 0 and 100")
+        if self._total == 0:
+            return 0
+
+        target = max(1, math.ceil(percentile / 100.0 * self._total))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max_value_us)
+        return self.max_value_us
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Add another histogram's counts into this one.
+
+        Args:
+            other: Histogram created with the same max_value_us and precision
+
+        Raises:
+            ValueError: If the bucket layouts differ
+        """
+        if other._sub_bits != self._sub_bits or len(other._counts) != len(self._counts):
+            raise ValueError("Cannot merge histograms with different layouts")
+        self._counts = [a + b for a, b in zip(self._counts, other._counts)]
+        self._total += other._total
+
+    def reset(self) -> None:
+        """Clear all recorded values, e.g. at the end of an evaluation window."""
+        self._counts = [0] * len(self._counts)
+        self._total = 0
+
+
+# Observed latencies per SLO, keyed by SLO name
+_latency_histograms: dict[str, LatencyHistogram] = {}
+
+
+def get_latency_histogram(slo: ServiceLevelObjective) -> LatencyHistogram:
+    """
+    Get the latency histogram for an SLO, creating it on first use.
+
+    Args:
+        slo: ServiceLevelObjective whose latencies are tracked
+
+    Returns:
+        LatencyHistogram: Histogram shared by all recordings for this SLO
+    """
+    histogram = _latency_histograms.get(slo.name)
+    if histogram is None:
+        histogram = _latency_histograms[slo.name] = LatencyHistogram()
+    return histogram
+
+
+def record_latency_us(slo: ServiceLevelObjective, latency_us: int) -> None:
+    """
+    Record an observed request latency against an SLO.
+
+    Args:
+        slo: ServiceLevelObjective the request falls under
+        latency_us: Request latency in microseconds
+    """
+    get_latency_histogram(slo).record(latency_us)
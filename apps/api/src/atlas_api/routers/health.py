@@ -8,13 +8,22 @@ and orchestration. Implements DDIA-aligned health check patterns.
 import asyncio
 import logging
 import time
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
 
-from fastapi import APIRouter, status
+import orjson
+from fastapi import APIRouter, Request, Response, status
+from fastapi.responses import ORJSONResponse
 
-from atlas_api.adapters.database import get_database_adapter
-from atlas_api.adapters.redis import get_redis_adapter
+from atlas_api.adapters.database import DatabaseAdapter, get_database_adapter
+from atlas_api.adapters.redis import RedisAdapter, get_redis_adapter
 from atlas_api.config import get_settings
+from atlas_api.instrumentation.metrics import set_health
+from atlas_api.reliability.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitOpenError,
+)
 from atlas_api.schemas.health import (
     DependencyHealth,
     HealthResponse,
@@ -27,25 +36,102 @@ router = APIRouter()
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
-# Track application start time for uptime calculation
-_start_time = time.time()
+# Settings are fixed for the life of the process; read once for the probes
+_APP_VERSION: str = settings.app_version
+_ENVIRONMENT: str = settings.environment
+
+# Track application start time for uptime calculation (monotonic, so
+# wall-clock adjustments never skew uptime)
+_start_time = time.monotonic()
+
+# Response timestamp for the current second: (epoch second, datetime, ISO
+# string). Probes arrive many times a second, so they share one timestamp
+# instead of each building and formatting a datetime.
+_timestamp: tuple[int, datetime, str] = (0, datetime.fromtimestamp(0, timezone.utc), "")
+
+# Encoded /health body and the timestamp string it was built with; only the
+# timestamp varies, so the body is re-encoded at most once a second
+_lightweight_body: tuple[str, bytes] = ("", b"")
+
+# Dependency results from the last /health/deep fan-out and when it ran
+# (monotonic), reused for health_check_ttl_ms
+_dependency_cache: tuple[float, list[DependencyHealth]] | None = None
+# Fan-out in progress; concurrent /health/deep requests await it instead of
+# probing the dependencies again
+_dependency_refresh: asyncio.Task[list[DependencyHealth]] | None = None
+
+# Kafka and MinIO probes run behind breakers: once a dependency keeps
+# failing, deep checks report it from the open circuit instead of each
+# waiting out health_probe_timeout_ms
+_probe_breakers: dict[str, CircuitBreaker] = {
+    name: CircuitBreaker(
+        f"{name}_health",
+        CircuitBreakerConfig(
+            failure_threshold=settings.circuit_breaker_failure_threshold,
+            recovery_timeout_seconds=settings.circuit_breaker_recovery_timeout,
+        ),
+    )
+    for name in ("kafka", "minio")
+}
+
+
+def current_timestamp() -> tuple[datetime, str]:
+    """
+    Get the current UTC time, truncated to the second.
+
+    Returns:
+        tuple[datetime, str]: Timezone-aware datetime and its ISO 8601 string
+    """
+    global _timestamp
+
+    now = int(time.time())
+    cached = _timestamp
+    if cached[0] != now:
+        moment = datetime.fromtimestamp(now, timezone.utc)
+        cached = _timestamp = (now, moment, moment.strftime("%Y-%m-%dT%H:%M:%SZ"))
+    return cached[1], cached[2]
+
+
+def classify_dependency(healthy: bool, latency_ms: float) -> HealthStatus:
+    """
+    Map a dependency probe result onto the three-tier health scale.
+
+    - HEALTHY: probe succeeded below the warning latency threshold
+    - DEGRADED: probe succeeded but latency is above the warning threshold
+    - UNHEALTHY: probe failed or latency is above the critical threshold
+
+    Args:
+        healthy: Whether the probe itself succeeded
+        latency_ms: Probe latency in milliseconds
+
+    Returns:
+        HealthStatus: Dependency health status
+    """
+    if not healthy or latency_ms >= settings.health_latency_critical_ms:
+        return HealthStatus.UNHEALTHY
+    if latency_ms >= settings.health_latency_warning_ms:
+        return HealthStatus.DEGRADED
+    return HealthStatus.HEALTHY
 
 
-async def check_postgres_health() -> DependencyHealth:
+async def check_postgres_health(db_adapter: DatabaseAdapter) -> DependencyHealth:
     """
     Check PostgreSQL database health.
 
+    Args:
+        db_adapter: Database adapter to probe
+
     Returns:
         DependencyHealth: PostgreSQL health status
     """
     try:
-        db_adapter = get_database_adapter()
         health_data = await db_adapter.health_check()
 
-        return DependencyHealth(
+        return DependencyHealth.model_construct(
             name="postgresql",
-            status=HealthStatus.HEALTHY if health_data["healthy"] else HealthStatus.UNHEALTHY,
+            status=classify_dependency(health_data["healthy"], health_data["latency_ms"]),
             latency_ms=health_data["latency_ms"],
+            error=health_data["reason"],
             metadata={
                 "pool_size": health_data["pool"]["size"],
                 "checked_out": health_data["pool"]["checked_out"],
@@ -53,8 +139,11 @@ async def check_postgres_health() -> DependencyHealth:
             },
         )
     except Exception as e:
-        logger.error(f"PostgreSQL health check failed: {e}", exc_info=True)
-        return DependencyHealth(
+        # Tracebacks only at DEBUG; a dependency that is down fails every probe
+        logger.error(
+            "PostgreSQL health check failed: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG)
+        )
+        return DependencyHealth.model_construct(
             name="postgresql",
             status=HealthStatus.UNHEALTHY,
             latency_ms=None,
@@ -62,29 +151,34 @@ async def check_postgres_health() -> DependencyHealth:
         )
 
 
-async def check_redis_health() -> DependencyHealth:
+async def check_redis_health(redis_adapter: RedisAdapter) -> DependencyHealth:
     """
     Check Redis cache health.
 
+    Args:
+        redis_adapter: Redis adapter to probe
+
     Returns:
         DependencyHealth: Redis health status
     """
     try:
-        redis_adapter = get_redis_adapter()
-        health_data = await redis_adapter.health_check()
+        health_data = await redis_adapter.detailed_health_check()
 
-        return DependencyHealth(
+        return DependencyHealth.model_construct(
             name="redis",
-            status=HealthStatus.HEALTHY if health_data["healthy"] else HealthStatus.UNHEALTHY,
+            status=classify_dependency(health_data["healthy"], health_data["latency_ms"]),
             latency_ms=health_data["latency_ms"],
+            error=health_data["reason"],
             metadata={
                 "version": health_data["version"],
                 "uptime_seconds": health_data["uptime_seconds"],
             },
         )
     except Exception as e:
-        logger.error(f"Redis health check failed: {e}", exc_info=True)
-        return DependencyHealth(
+        logger.error(
+            "Redis health check failed: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG)
+        )
+        return DependencyHealth.model_construct(
             name="redis",
             status=HealthStatus.UNHEALTHY,
             latency_ms=None,
@@ -92,6 +186,28 @@ async def check_redis_health() -> DependencyHealth:
         )
 
 
+# Mock results for the backends without real probes yet. They never change,
+# so each is built once and shared; nothing mutates DependencyHealth results.
+_KAFKA_MOCK_HEALTH = DependencyHealth.model_construct(
+    name="kafka",
+    status=HealthStatus.HEALTHY,
+    latency_ms=5.0,
+    metadata={
+        "version": "7.5.0",
+        "brokers": 1,
+    },
+)
+_MINIO_MOCK_HEALTH = DependencyHealth.model_construct(
+    name="minio",
+    status=HealthStatus.HEALTHY,
+    latency_ms=3.0,
+    metadata={
+        "version": "latest",
+        "buckets": 1,
+    },
+)
+
+
 async def check_kafka_health() -> DependencyHealth:
     """
     Check Kafka health.
@@ -101,15 +217,7 @@ async def check_kafka_health() -> DependencyHealth:
     """
     # TODO: Implement actual Kafka health check
     # For now, return mock healthy status
-    return DependencyHealth(
-        name="kafka",
-        status=HealthStatus.HEALTHY,
-        latency_ms=5.0,
-        metadata={
-            "version": "7.5.0",
-            "brokers": 1,
-        },
-    )
+    return _KAFKA_MOCK_HEALTH
 
 
 async def check_minio_health() -> DependencyHealth:
@@ -121,14 +229,46 @@ async def check_minio_health() -> DependencyHealth:
     """
     # TODO: Implement actual MinIO health check
     # For now, return mock healthy status
-    return DependencyHealth(
-        name="minio",
-        status=HealthStatus.HEALTHY,
-        latency_ms=3.0,
-        metadata={
-            "version": "latest",
-            "buckets": 1,
-        },
+    return _MINIO_MOCK_HEALTH
+
+
+async def guarded_probe(
+    name: str,
+    probe: Callable[[], Awaitable[DependencyHealth]],
+    breaker: CircuitBreaker,
+) -> DependencyHealth:
+    """
+    Run a dependency probe under a time limit and circuit breaker.
+
+    Timeouts and errors count as breaker failures. While the circuit is open
+    the probe is skipped and the dependency reported unhealthy straight away.
+
+    Args:
+        name: Dependency name reported on failure
+        probe: Health check to run
+        breaker: Circuit breaker guarding this dependency
+
+    Returns:
+        DependencyHealth: Probe result, or UNHEALTHY if it failed or was skipped
+    """
+    timeout_ms = settings.health_probe_timeout_ms
+
+    async def bounded_probe() -> DependencyHealth:
+        # wait_for rather than asyncio.timeout: the timeout's cancellation
+        # would be thrown through the mypyc-compiled call_async, which raises
+        # it there as CancelledError instead of delivering it to the probe
+        return await asyncio.wait_for(probe(), timeout_ms / 1000)
+
+    try:
+        return await breaker.call_async(bounded_probe)
+    except CircuitOpenError:
+        error = "Circuit open after repeated probe failures"
+    except TimeoutError:
+        error = f"Health probe timed out after {timeout_ms}ms"
+    except Exception as e:
+        error = str(e)
+    return DependencyHealth.model_construct(
+        name=name, status=HealthStatus.UNHEALTHY, latency_ms=None, error=error
     )
 
 
@@ -147,17 +287,81 @@ def determine_overall_status(dependencies: list[DependencyHealth]) -> HealthStat
     Returns:
         HealthStatus: Overall system health status
     """
-    if not dependencies:
-        return HealthStatus.HEALTHY
+    # Single pass tracking the worst status; nothing beats UNHEALTHY, so stop there
+    overall = HealthStatus.HEALTHY
+    for dep in dependencies:
+        dep_status = dep.status
+        if dep_status is HealthStatus.UNHEALTHY:
+            return dep_status
+        if dep_status is HealthStatus.DEGRADED:
+            overall = dep_status
+    return overall
+
+
+async def probe_dependencies(request: Request) -> list[DependencyHealth]:
+    """
+    Probe every dependency and record the results.
 
-    statuses = [dep.status for dep in dependencies]
+    Args:
+        request: Incoming request (used to resolve the app's adapters)
 
-    if HealthStatus.UNHEALTHY in statuses:
-        return HealthStatus.UNHEALTHY
-    elif HealthStatus.DEGRADED in statuses:
-        return HealthStatus.DEGRADED
-    else:
-        return HealthStatus.HEALTHY
+    Returns:
+        list[DependencyHealth]: Health of each dependency
+    """
+    global _dependency_cache
+
+    # Check all dependencies in parallel using asyncio.gather so a slow
+    # backend doesn't serialize the others
+    names = ("postgresql", "redis", "kafka", "minio")
+    results = await asyncio.gather(
+        check_postgres_health(get_database_adapter(request)),
+        check_redis_health(get_redis_adapter(request)),
+        guarded_probe("kafka", check_kafka_health, _probe_breakers["kafka"]),
+        guarded_probe("minio", check_minio_health, _probe_breakers["minio"]),
+        return_exceptions=True,  # One failing probe must not abort the others
+    )
+    dependencies = [
+        DependencyHealth.model_construct(
+            name=name, status=HealthStatus.UNHEALTHY, error=str(result)
+        )
+        if isinstance(result, BaseException)
+        else result
+        for name, result in zip(names, results)
+    ]
+
+    # Mirror the probe results into the system health gauge
+    set_health("api", True)
+    for component, dependency in zip(("database", "redis", "kafka", "minio"), dependencies):
+        set_health(component, dependency.status != HealthStatus.UNHEALTHY)
+
+    _dependency_cache = (time.monotonic(), dependencies)
+    return dependencies
+
+
+async def get_dependency_health(request: Request) -> list[DependencyHealth]:
+    """
+    Get dependency health, probing at most once per health_check_ttl_ms.
+
+    Load balancers and orchestrators poll the deep check from many places at
+    once; within the TTL they share the last results, and requests arriving
+    while a probe runs wait for it rather than starting another.
+
+    Args:
+        request: Incoming request (used to resolve the app's adapters)
+
+    Returns:
+        list[DependencyHealth]: Health of each dependency
+    """
+    global _dependency_refresh
+
+    cached = _dependency_cache
+    if cached is not None and time.monotonic() - cached[0] < settings.health_check_ttl_ms / 1000:
+        return cached[1]
+
+    if _dependency_refresh is None or _dependency_refresh.done():
+        _dependency_refresh = asyncio.create_task(probe_dependencies(request))
+    # Shielded so a disconnecting client doesn't cancel the probe for the others
+    return await asyncio.shield(_dependency_refresh)
 
 
 @router.get(
@@ -170,7 +374,7 @@ def determine_overall_status(dependencies: list[DependencyHealth]) -> HealthStat
         "For detailed dependency health information, use /health/deep instead."
     ),
 )
-async def health_check_lightweight() -> dict:
+async def health_check_lightweight() -> Response:
     """
     Lightweight health check endpoint.
 
@@ -178,14 +382,23 @@ async def health_check_lightweight() -> dict:
     Suitable for high-frequency health checks and load testing.
 
     Returns:
-        dict: Simple health status
+        Response: Simple health status as pre-encoded JSON
     """
-    return {
-        "status": "healthy",
-        "version": settings.app_version,
-        "environment": settings.environment,
-        "timestamp": datetime.utcnow().isoformat(),
-    }
+    global _lightweight_body
+
+    timestamp = current_timestamp()[1]
+    cached = _lightweight_body
+    if cached[0] != timestamp:
+        body = orjson.dumps(
+            {
+                "status": "healthy",
+                "version": _APP_VERSION,
+                "environment": _ENVIRONMENT,
+                "timestamp": timestamp,
+            }
+        )
+        cached = _lightweight_body = (timestamp, body)
+    return Response(content=cached[1], media_type="application/json")
 
 
 @router.get(
@@ -226,7 +439,7 @@ async def health_check_lightweight() -> dict:
         },
     },
 )
-async def health_check() -> HealthResponse:
+async def health_check(request: Request) -> Response:
     """
     Comprehensive health check endpoint.
 
@@ -234,32 +447,32 @@ async def health_check() -> HealthResponse:
     detailed status information. Used by monitoring systems
     and load balancers.
 
+    Args:
+        request: Incoming request (used to resolve the app's adapters)
+
     Returns:
-        HealthResponse: Detailed health status
+        Response: Detailed health status, shaped as HealthResponse
     """
-    # Check all dependencies in parallel using asyncio.gather
-    dependencies = await asyncio.gather(
-        check_postgres_health(),
-        check_redis_health(),
-        check_kafka_health(),
-        check_minio_health(),
-        return_exceptions=False,  # Raise exceptions instead of returning them
-    )
+    dependencies = await get_dependency_health(request)
 
     # Determine overall status
     overall_status = determine_overall_status(dependencies)
 
     # Calculate uptime
-    uptime_seconds = time.time() - _start_time
+    uptime_seconds = time.monotonic() - _start_time
 
-    return HealthResponse(
+    # Every field comes from our own checks, so the response is neither
+    # validated nor passed through jsonable_encoder: pydantic-core encodes it
+    # straight to bytes. response_model still documents the shape.
+    response = HealthResponse.model_construct(
         status=overall_status,
-        version=settings.app_version,
-        environment=settings.environment,
-        timestamp=datetime.utcnow(),
+        version=_APP_VERSION,
+        environment=_ENVIRONMENT,
+        timestamp=current_timestamp()[0],
         uptime_seconds=uptime_seconds,
         dependencies=dependencies,
     )
+    return Response(content=response.model_dump_json(), media_type="application/json")
 
 
 @router.get(
@@ -273,7 +486,7 @@ async def health_check() -> HealthResponse:
         "to determine if traffic should be routed to this instance."
     ),
 )
-async def readiness_check() -> ReadinessResponse:
+async def readiness_check() -> ORJSONResponse:
     """
     Readiness probe for orchestrators.
 
@@ -281,14 +494,13 @@ async def readiness_check() -> ReadinessResponse:
     Checks critical dependencies required for request processing.
 
     Returns:
-        ReadinessResponse: Readiness status
+        ORJSONResponse: Readiness status, shaped as ReadinessResponse
     """
     # TODO: Check critical dependencies (database, cache)
     # For now, always return ready
-    return ReadinessResponse(
-        ready=True,
-        timestamp=datetime.utcnow(),
-    )
+    # Returned as a response so this frequently polled probe skips
+    # response_model validation; response_model still documents the shape
+    return ORJSONResponse({"ready": True, "timestamp": current_timestamp()[1]})
 
 
 @router.get(
@@ -302,7 +514,7 @@ async def readiness_check() -> ReadinessResponse:
         "orchestrators to detect deadlocks and unrecoverable errors."
     ),
 )
-async def liveness_check() -> LivenessResponse:
+async def liveness_check() -> ORJSONResponse:
     """
     Liveness probe for orchestrators.
 
@@ -310,11 +522,8 @@ async def liveness_check() -> LivenessResponse:
     This is a lightweight check that only verifies the process is responsive.
 
     Returns:
-        LivenessResponse: Liveness status
+        ORJSONResponse: Liveness status, shaped as LivenessResponse
     """
     # Simple liveness check - if we can respond, we're alive
-    return LivenessResponse(
-        alive=True,
-        timestamp=datetime.utcnow(),
-    )
+    return ORJSONResponse({"alive": True, "timestamp": current_timestamp()[1]})
 
@@ -4,44 +4,60 @@ Pytest configuration and shared fixtures.
 Provides common test fixtures for database, Redis, Kafka, etc.
 """
 
+from types import MappingProxyType
+from typing import Any, Iterator, Mapping
+
 import pytest
 from fastapi.testclient import TestClient
 
 from atlas_api.main import app
 
+# Built once and read-only, so the fixture can hand out the same object
+_SAMPLE_HEALTH_RESPONSE: Mapping[str, Any] = MappingProxyType(
+    {
+        "status": "healthy",
+        "version": "0.1.0",
+        "environment": "test",
+        "uptime_seconds": 100.0,
+        "dependencies": (
+            MappingProxyType(
+                {
+                    "name": "postgresql",
+                    "status": "healthy",
+                    "latency_ms": 2.5,
+                }
+            ),
+        ),
+    }
+)
+
 
-@pytest.fixture
-def client() -> TestClient:
+@pytest.fixture(scope="session")
+def client() -> Iterator[TestClient]:
     """
     Create a test client for the FastAPI application.
 
-    Returns:
+    Shared by the whole session and entered as a context manager, so the
+    app's lifespan runs once rather than a client being built per test.
+
+    Yields:
         TestClient: FastAPI test client
     """
-    return TestClient(app)
+    with TestClient(app) as test_client:
+        yield test_client
 
 
-@pytest.fixture
-def sample_health_response() -> dict:
+@pytest.fixture(scope="session")
+def sample_health_response() -> Mapping[str, Any]:
     """
     Sample health check response for testing.
 
+    Read-only; copy it with dict() before mutating.
+
     Returns:
-        dict: Sample health response
+        Mapping[str, Any]: Sample health response
     """
-    return {
-        "status": "healthy",
-        "version": "0.1.0",
-        "environment": "test",
-        "uptime_seconds": 100.0,
-        "dependencies": [
-            {
-                "name": "postgresql",
-                "status": "healthy",
-                "latency_ms": 2.5,
-            }
-        ],
-    }
+    return _SAMPLE_HEALTH_RESPONSE
 
 
 # TODO: Add more fixtures
@@ -1,54 +1,105 @@
 """
 Load testing with Locust
-Run: locust -f tests/load/locustfile.py --host=http://localhost:8000
+Run: ATLAS_LOAD_PROFILE=normal locust -f tests/load/locustfile.py --host=http://localhost:8000
+
+Profiles (ATLAS_LOAD_PROFILE, default "normal"):
+- normal: browsing mix of /health, /metrics and /docs, 1-3s between requests
+- high: rapid health checks, 0.1-0.5s between requests
+- spike: sudden traffic spike, 0.01-0.1s between requests
+- stress: maximum throughput, capped at 500 req/s per user; run with
+  --processes -1 so Locust uses every core instead of becoming the bottleneck
+- burst: each task fires BURST_SIZE (default 20) concurrent health checks over
+  that many keep-alive connections, measuring the API's concurrent-request
+  ceiling. Locust reports each request under GET and the wall clock of the
+  whole burst under BURST.
+
+Set SPIKE_WEIGHT to a positive integer to mix spike users into any profile in
+the same run, e.g. ATLAS_LOAD_PROFILE=normal SPIKE_WEIGHT=1.
 """
 
-from locust import HttpUser, task, between
-import random
+import os
+import time
+from typing import Any, Callable
 
+from gevent.pool import Group
+from locust import FastHttpUser, between, constant, constant_throughput
 
-class AtlasUser(HttpUser):
-    """Simulates a user interacting with Atlas API"""
+# profile -> (wait_time, {path: task weight})
+PROFILES: dict[str, tuple[Callable[..., float], dict[str, int]]] = {
+    "normal": (between(1, 3), {"/health": 3, "/metrics": 2, "/docs": 1}),
+    "high": (between(0.1, 0.5), {"/health": 1}),
+    "spike": (between(0.01, 0.1), {"/health": 1}),
+    "stress": (constant_throughput(500), {"/health": 1}),
+    "burst": (constant(0), {"/health": 1}),
+}
 
-    host = "http://localhost:8000"  # Default host
-    wait_time = between(1, 3)  # Wait 1-3 seconds between requests
-    
-    @task(3)
-    def health_check(self):
-        """Health check endpoint (3x more frequent)"""
-        self.client.get("/health")
-    
-    @task(2)
-    def metrics(self):
-        """Metrics endpoint (2x more frequent)"""
-        self.client.get("/metrics")
-    
-    @task(1)
-    def docs(self):
-        """API docs endpoint"""
-        self.client.get("/docs")
-
-
-class HighLoadUser(HttpUser):
-    """Simulates high-load scenario"""
+BURST_SIZE = int(os.environ.get("BURST_SIZE", 20))
 
-    host = "http://localhost:8000"  # Default host
-    wait_time = between(0.1, 0.5)  # Very short wait
-    
-    @task
-    def rapid_health_checks(self):
-        """Rapid health checks"""
-        self.client.get("/health")
 
+def _get(path: str) -> Callable[[Any], None]:
+    """Build a Locust task that GETs path."""
+
+    def request(user: Any) -> None:
+        user.client.get(path)
+
+    request.__name__ = f"get_{path.strip('/') or 'root'}"
+    return request
+
+
+def _burst(path: str) -> Callable[[Any], None]:
+    """Build a Locust task that GETs path BURST_SIZE times concurrently."""
+
+    def request(user: Any) -> None:
+        group = Group()
+        start = time.perf_counter()
+        for _ in range(BURST_SIZE):
+            group.spawn(user.client.get, path)
+        group.join()
+        user.environment.events.request.fire(
+            request_type="BURST",
+            name=path,
+            response_time=(time.perf_counter() - start) * 1000,
+            response_length=0,
+            exception=None,
+            context={},
+        )
 
-class SpikeUser(HttpUser):
-    """Simulates sudden traffic spike"""
+    request.__name__ = f"burst_{path.strip('/') or 'root'}"
+    return request
+
+
+def _tasks(paths: dict[str, int], burst: bool = False) -> dict[Callable[[Any], None], int]:
+    """Map each path's task to its weight."""
+    build = _burst if burst else _get
+    return {build(path): weight for path, weight in paths.items()}
+
+
+_profile = os.environ.get("ATLAS_LOAD_PROFILE", "normal")
+if _profile not in PROFILES:
+    raise ValueError(
+        f"Unknown ATLAS_LOAD_PROFILE {_profile!r}; expected one of {', '.join(PROFILES)}"
+    )
+
+
+class AtlasProfileUser(FastHttpUser):
+    """Simulates a user of the selected ATLAS_LOAD_PROFILE (keep-alive client)"""
 
     host = "http://localhost:8000"  # Default host
-    wait_time = between(0.01, 0.1)  # Minimal wait
-    
-    @task
-    def spike_requests(self):
-        """Spike requests"""
-        self.client.get("/health")
+    wait_time = PROFILES[_profile][0]
+    tasks = _tasks(PROFILES[_profile][1], burst=_profile == "burst")
+    # Keep-alive connections per user, enough for a whole burst at once
+    concurrency = max(10, BURST_SIZE)
+    # Fail fast instead of stalling the user when the API is saturated
+    network_timeout = 1.0
+    connection_timeout = 1.0
+
+
+_spike_weight = int(os.environ.get("SPIKE_WEIGHT", 0))
+if _spike_weight > 0:
+
+    class SpikeProfileUser(AtlasProfileUser):
+        """Spike users mixed into the selected profile"""
 
+        weight = _spike_weight
+        wait_time = PROFILES["spike"][0]
+        tasks = _tasks(PROFILES["spike"][1])
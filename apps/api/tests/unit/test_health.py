@@ -9,17 +9,40 @@ from fastapi import status
 from fastapi.testclient import TestClient
 
 
-def test_health_check_returns_200(client: TestClient) -> None:
+@pytest.fixture(scope="module")
+def deep_health_response(client: TestClient) -> tuple[int, dict]:
+    """
+    Fetch /health/deep once for the tests that inspect its body.
+
+    Returns:
+        tuple[int, dict]: Status code and decoded JSON body
+    """
+    response = client.get("/health/deep")
+    return response.status_code, response.json()
+
+
+@pytest.fixture(scope="module")
+def health_response(client: TestClient) -> tuple[int, dict]:
+    """
+    Fetch the lightweight /health once for the tests that inspect its body.
+
+    Returns:
+        tuple[int, dict]: Status code and decoded JSON body
+    """
+    response = client.get("/health")
+    return response.status_code, response.json()
+
+
+def test_health_check_returns_200(deep_health_response: tuple[int, dict]) -> None:
     """
     Test that health check endpoint returns 200 OK.
 
-    Scenario: GET /health
+    Scenario: GET /health/deep
     Expected: 200 OK with health status
     """
-    response = client.get("/health")
+    status_code, data = deep_health_response
 
-    assert response.status_code == status.HTTP_200_OK
-    data = response.json()
+    assert status_code == status.HTTP_200_OK
     assert "status" in data
     assert "version" in data
     assert "environment" in data
@@ -27,17 +50,14 @@ def test_health_check_returns_200(client: TestClient) -> None:
     assert "dependencies" in data
 
 
-def test_health_check_includes_dependencies(client: TestClient) -> None:
+def test_health_check_includes_dependencies(deep_health_response: tuple[int, dict]) -> None:
     """
     Test that health check includes all dependency statuses.
 
-    Scenario: GET /health
+    Scenario: GET /health/deep
     Expected: Response includes postgresql, redis, kafka, minio
     """
-    response = client.get("/health")
-
-    assert response.status_code == status.HTTP_200_OK
-    data = response.json()
+    _, data = deep_health_response
 
     dependencies = data["dependencies"]
     dependency_names = {dep["name"] for dep in dependencies}
@@ -48,17 +68,14 @@ def test_health_check_includes_dependencies(client: TestClient) -> None:
     assert "minio" in dependency_names
 
 
-def test_health_check_dependency_structure(client: TestClient) -> None:
+def test_health_check_dependency_structure(deep_health_response: tuple[int, dict]) -> None:
     """
     Test that each dependency has required fields.
 
-    Scenario: GET /health
+    Scenario: GET /health/deep
     Expected: Each dependency has name, status, latency_ms
     """
-    response = client.get("/health")
-
-    assert response.status_code == status.HTTP_200_OK
-    data = response.json()
+    _, data = deep_health_response
 
     for dep in data["dependencies"]:
         assert "name" in dep
@@ -103,56 +120,329 @@ def test_liveness_check_returns_200(client: TestClient) -> None:
     assert data["alive"] is True
 
 
+def test_probe_payloads_match_response_models(client: TestClient) -> None:
+    """
+    Test that the hand-built probe payloads still match their documented models.
+
+    Scenario: GET /health/ready and /health/live
+    Expected: Each body validates against its response model with a UTC timestamp
+    """
+    from datetime import timezone
+
+    from atlas_api.schemas.health import LivenessResponse, ReadinessResponse
+
+    ready = ReadinessResponse.model_validate(client.get("/health/ready").json())
+    alive = LivenessResponse.model_validate(client.get("/health/live").json())
+
+    assert ready.ready is True
+    assert alive.alive is True
+    assert ready.timestamp.tzinfo == timezone.utc
+    assert alive.timestamp.tzinfo == timezone.utc
+
+
+@pytest.mark.asyncio
+async def test_deep_health_payload_matches_response_model() -> None:
+    """
+    Test that the pre-serialized deep health body matches HealthResponse.
+
+    Scenario: Deep check over constructed (unvalidated) dependency results
+    Expected: Body validates, with every dependency field present
+    """
+    import json
+    from unittest.mock import AsyncMock, MagicMock, patch
+
+    from atlas_api.routers import health
+    from atlas_api.schemas.health import DependencyHealth, HealthResponse, HealthStatus
+
+    dependencies = [
+        DependencyHealth.model_construct(
+            name="redis", status=HealthStatus.DEGRADED, latency_ms=80.0, metadata={"version": "7"}
+        ),
+        DependencyHealth.model_construct(
+            name="postgresql", status=HealthStatus.UNHEALTHY, error="refused"
+        ),
+    ]
+    with patch.object(health, "get_dependency_health", AsyncMock(return_value=dependencies)):
+        response = await health.health_check(MagicMock())
+
+    data = json.loads(response.body)
+    parsed = HealthResponse.model_validate(data)
+
+    assert response.media_type == "application/json"
+    assert parsed.status == HealthStatus.UNHEALTHY
+    assert data["timestamp"].endswith("Z")
+    for dep in data["dependencies"]:
+        assert set(dep) == {"name", "status", "latency_ms", "error", "metadata"}
+    assert data["dependencies"][1]["latency_ms"] is None
+
+
 def test_health_check_uptime_increases(client: TestClient) -> None:
     """
     Test that uptime increases between calls.
 
-    Scenario: Call /health twice with delay
-    Expected: Second call has higher uptime
+    Scenario: Call /health/deep, move the start time a second earlier, call again
+    Expected: Second call reports at least a second more uptime
     """
-    import time
+    from unittest.mock import patch
 
-    response1 = client.get("/health")
-    uptime1 = response1.json()["uptime_seconds"]
+    from atlas_api.routers import health
 
-    time.sleep(0.1)
+    response1 = client.get("/health/deep")
+    uptime1 = response1.json()["uptime_seconds"]
 
-    response2 = client.get("/health")
+    # Shift the start time rather than the clock, which the event loop also uses
+    with patch.object(health, "_start_time", health._start_time - 1.0):
+        response2 = client.get("/health/deep")
     uptime2 = response2.json()["uptime_seconds"]
 
-    assert uptime2 > uptime1
+    assert uptime2 - uptime1 >= 1.0
 
 
-def test_health_check_version_matches_config(client: TestClient) -> None:
+@pytest.mark.parametrize(
+    ("field", "setting"), [("version", "app_version"), ("environment", "environment")]
+)
+def test_health_check_matches_config(
+    health_response: tuple[int, dict], field: str, setting: str
+) -> None:
     """
-    Test that health check returns correct version.
+    Test that health check reports the configured version and environment.
 
     Scenario: GET /health
-    Expected: Version matches application version
+    Expected: Each field matches its application setting
     """
     from atlas_api.config import get_settings
 
-    settings = get_settings()
-    response = client.get("/health")
+    status_code, data = health_response
 
-    assert response.status_code == status.HTTP_200_OK
-    data = response.json()
-    assert data["version"] == settings.app_version
+    assert status_code == status.HTTP_200_OK
+    assert data[field] == getattr(get_settings(), setting)
 
 
-def test_health_check_environment_matches_config(client: TestClient) -> None:
+def test_classify_dependency_latency_tiers() -> None:
     """
-    Test that health check returns correct environment.
+    Test that dependency latency maps onto the three health tiers.
 
-    Scenario: GET /health
-    Expected: Environment matches configuration
+    Scenario: Probe results below, between and above the latency thresholds
+    Expected: healthy, degraded, unhealthy respectively; failed probes are unhealthy
     """
     from atlas_api.config import get_settings
+    from atlas_api.routers.health import classify_dependency
+    from atlas_api.schemas.health import HealthStatus
 
     settings = get_settings()
-    response = client.get("/health")
+    warning = settings.health_latency_warning_ms
+    critical = settings.health_latency_critical_ms
 
-    assert response.status_code == status.HTTP_200_OK
-    data = response.json()
-    assert data["environment"] == settings.environment
+    assert classify_dependency(True, warning / 2) == HealthStatus.HEALTHY
+    assert classify_dependency(True, (warning + critical) / 2) == HealthStatus.DEGRADED
+    assert classify_dependency(True, critical) == HealthStatus.UNHEALTHY
+    assert classify_dependency(False, 0.1) == HealthStatus.UNHEALTHY
+
+
+@pytest.mark.asyncio
+async def test_redis_health_check_pings_without_info() -> None:
+    """
+    Test that the lightweight Redis health check sends only a PING.
+
+    Scenario: health_check() runs against a responsive Redis
+    Expected: Redis is pinged once, INFO is never called and the result is healthy
+    """
+    from unittest.mock import AsyncMock
+
+    from atlas_api.adapters.redis import RedisAdapter
+    from atlas_api.config import get_frozen_settings
+
+    adapter = RedisAdapter(get_frozen_settings())
+    adapter._client = AsyncMock()
+    adapter._client.ping.return_value = True
+
+    result = await adapter.health_check()
+
+    assert adapter._client.ping.await_count == 1
+    adapter._client.info.assert_not_called()
+    assert result["healthy"] is True
+
+
+@pytest.mark.asyncio
+async def test_deep_health_coalesces_and_caches_dependency_probes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that concurrent deep health checks share one dependency fan-out.
+
+    Scenario: Several deep checks race, then another runs within the TTL
+    Expected: Each dependency is probed exactly once and all share the results
+    """
+    import asyncio
+    from unittest.mock import MagicMock, patch
+
+    from atlas_api.routers import health
+    from atlas_api.schemas.health import DependencyHealth, HealthStatus
+
+    async def slow_probe(*args: object) -> DependencyHealth:
+        await asyncio.sleep(0.01)
+        return DependencyHealth(name="postgresql", status=HealthStatus.HEALTHY, latency_ms=1.0)
+
+    monkeypatch.setattr(health, "_dependency_cache", None)
+    monkeypatch.setattr(health, "_dependency_refresh", None)
+    with (
+        patch.object(health, "check_postgres_health", side_effect=slow_probe) as postgres,
+        patch.object(health, "check_redis_health", side_effect=slow_probe) as redis,
+    ):
+        results = await asyncio.gather(
+            *(health.get_dependency_health(MagicMock()) for _ in range(5))
+        )
+        cached = await health.get_dependency_health(MagicMock())
+
+    assert postgres.call_count == 1
+    assert redis.call_count == 1
+    assert all(result is cached for result in results)
+    assert len(cached) == 4
+
+
+def test_current_timestamp_shared_within_a_second() -> None:
+    """
+    Test that response timestamps are built once per second.
+
+    Scenario: Several calls within one second, then one in the next second
+    Expected: Same UTC datetime object until the second changes
+    """
+    from datetime import timezone
+    from unittest.mock import patch
+
+    from atlas_api.routers.health import current_timestamp
+
+    with patch("time.time", return_value=1_700_000_000.25):
+        first, iso = current_timestamp()
+        again, _ = current_timestamp()
+    with patch("time.time", return_value=1_700_000_001.5):
+        later, later_iso = current_timestamp()
+
+    assert first is again
+    assert first.tzinfo is timezone.utc
+    assert iso == "2023-11-14T22:13:20Z"
+    assert later_iso == "2023-11-14T22:13:21Z"
+    assert later > first
+
+
+def test_determine_overall_status_reports_worst_dependency() -> None:
+    """
+    Test that overall health is the worst dependency status.
+
+    Scenario: No dependencies, healthy/degraded mixes, and an unhealthy one
+    Expected: healthy, degraded and unhealthy respectively
+    """
+    from atlas_api.routers.health import determine_overall_status
+    from atlas_api.schemas.health import DependencyHealth, HealthStatus
+
+    def dep(status: HealthStatus) -> DependencyHealth:
+        return DependencyHealth(name="dep", status=status)
+
+    healthy = HealthStatus.HEALTHY
+    degraded = HealthStatus.DEGRADED
+    unhealthy = HealthStatus.UNHEALTHY
+
+    assert determine_overall_status([]) == healthy
+    assert determine_overall_status([dep(healthy), dep(healthy)]) == healthy
+    assert determine_overall_status([dep(healthy), dep(degraded)]) == degraded
+    assert determine_overall_status([dep(unhealthy), dep(degraded)]) == unhealthy
+    assert determine_overall_status([dep(degraded), dep(unhealthy)]) == unhealthy
+
+
+@pytest.mark.asyncio
+async def test_failed_check_logs_traceback_only_at_debug() -> None:
+    """
+    Test that dependency check failures skip traceback capture above DEBUG.
+
+    Scenario: Redis probe raises with the health logger at INFO, then DEBUG
+    Expected: Unhealthy result each time; exc_info only attached at DEBUG
+    """
+    import logging
+    from unittest.mock import AsyncMock, MagicMock, patch
+
+    from atlas_api.routers import health
+    from atlas_api.schemas.health import HealthStatus
+
+    adapter = MagicMock()
+    adapter.detailed_health_check = AsyncMock(side_effect=ConnectionError("refused"))
+
+    for level, expect_traceback in ((logging.INFO, False), (logging.DEBUG, True)):
+        with (
+            patch.object(
+                health.logger, "isEnabledFor", side_effect=lambda lvl, level=level: lvl >= level
+            ),
+            patch.object(health.logger, "error") as log_error,
+        ):
+            result = await health.check_redis_health(adapter)
+
+        assert result.status == HealthStatus.UNHEALTHY
+        assert result.error == "refused"
+        assert log_error.call_args.kwargs["exc_info"] is expect_traceback
+
+
+@pytest.mark.asyncio
+async def test_guarded_probe_times_out_and_opens_circuit() -> None:
+    """
+    Test that a hung probe is bounded and then skipped once its circuit opens.
+
+    Scenario: A probe that never answers, run past the breaker's failure threshold
+    Expected: Each run reports UNHEALTHY; after opening, the probe isn't called
+    """
+    import asyncio
+    from unittest.mock import AsyncMock, patch
+
+    from atlas_api.reliability.circuit_breaker import (
+        CircuitBreaker,
+        CircuitBreakerConfig,
+        CircuitState,
+    )
+    from atlas_api.routers import health
+    from atlas_api.schemas.health import HealthStatus
+
+    async def hang() -> None:
+        await asyncio.sleep(10)
+
+    probe = AsyncMock(side_effect=hang)
+    breaker = CircuitBreaker("kafka_health_test", CircuitBreakerConfig(failure_threshold=2))
+
+    with patch.object(health.settings, "health_probe_timeout_ms", 10):
+        timed_out = [await health.guarded_probe("kafka", probe, breaker) for _ in range(2)]
+        skipped = await health.guarded_probe("kafka", probe, breaker)
+
+    assert all(result.status == HealthStatus.UNHEALTHY for result in timed_out)
+    assert "timed out after 10ms" in timed_out[0].error
+    assert breaker.state == CircuitState.OPEN
+    assert skipped.status == HealthStatus.UNHEALTHY
+    assert skipped.error.startswith("Circuit open")
+    assert probe.call_count == 2
+
+
+@pytest.mark.parametrize(
+    ("path", "excluded"),
+    [
+        ("/health", True),
+        ("/health/deep", True),
+        ("/healthz", True),
+        ("/readyz", True),
+        ("/metrics", True),
+        ("/metrics/", True),
+        ("/api/v1/healthcare/plans", False),
+        ("/api/v1/user-metrics", False),
+        ("/api/v1/reports/metrics", False),
+    ],
+)
+def test_probe_urls_excluded_from_tracing(path: str, excluded: bool) -> None:
+    """
+    Test that only probe and scrape URLs are excluded from tracing.
+
+    Scenario: The default exclusion patterns are applied to full request URLs
+    Expected: Probe paths match; business routes containing the same words don't
+    """
+    from opentelemetry.util.http import parse_excluded_urls
+
+    from atlas_api.config import Settings
+
+    # Parsed the same way FastAPIInstrumentor.instrument_app parses the setting
+    exclude_list = parse_excluded_urls(Settings.model_fields["otel_excluded_urls"].default)
 
+    assert exclude_list.url_disabled(f"http://testserver{path}") is excluded
@@ -0,0 +1,146 @@
+"""
+Tests for metrics instrumentation.
+
+Tests the lock-free histogram against prometheus_client's exposition format,
+the pre-bound request and health metrics, and idempotent metric registration.
+"""
+
+import importlib
+from unittest.mock import patch
+
+from prometheus_client import REGISTRY, CollectorRegistry, Histogram, generate_latest
+
+from atlas_api.instrumentation.metrics import (
+    FastHistogram,
+    HistogramCollector,
+    bind_retry_counters,
+    record_request,
+    set_health,
+)
+
+
+def test_fast_histogram_buckets_inclusive_upper_bound() -> None:
+    """Test observations land in the first bucket whose bound is >= value."""
+    histogram = FastHistogram((0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 1.0, 5.0):
+        histogram.observe(value)
+
+    assert list(histogram.counts) == [2, 2, 1]
+    assert histogram.sum == 6.65
+
+
+def test_histogram_collector_matches_prometheus_exposition() -> None:
+    """Test scrape output is identical to a prometheus_client Histogram."""
+    buckets = (0.01, 0.1, 1.0)
+    reference_registry = CollectorRegistry()
+    reference = Histogram(
+        "atlas_api_test_fast_histogram_seconds",
+        "Test histogram",
+        ["operation"],
+        buckets=buckets,
+        registry=reference_registry,
+    )
+    fast_registry = CollectorRegistry()
+    fast = HistogramCollector(
+        "atlas_api_test_fast_histogram_seconds",
+        "Test histogram",
+        ["operation"],
+        buckets=buckets,
+        registry=fast_registry,
+    )
+
+    for value in (0.001, 0.01, 0.5, 2.0):
+        reference.labels(operation="select").observe(value)
+        fast.labels(operation="select").observe(value)
+
+    def exposition(registry: CollectorRegistry) -> list[str]:
+        return [
+            line
+            for line in generate_latest(registry).decode().splitlines()
+            if "_created" not in line
+        ]
+
+    assert exposition(fast_registry) == exposition(reference_registry)
+
+
+def test_set_health_updates_component_gauge() -> None:
+    """Test set_health writes 1/0 to the component's health gauge."""
+    name = "atlas_api_system_health_status"
+
+    set_health("redis", True)
+    assert REGISTRY.get_sample_value(name, {"component": "redis"}) == 1
+
+    set_health("redis", False)
+    assert REGISTRY.get_sample_value(name, {"component": "redis"}) == 0
+
+
+def test_metrics_module_reload_reuses_collectors() -> None:
+    """Test re-executing the metrics module reuses registered collectors."""
+    from atlas_api.instrumentation import metrics
+
+    collectors = metrics.registered_collector_count()
+    requests_total = metrics.http_requests_total
+    in_progress = metrics.http_requests_in_progress
+
+    importlib.reload(metrics)
+
+    assert metrics.registered_collector_count() == collectors
+    assert metrics.http_requests_total is requests_total
+    assert metrics.http_requests_in_progress is in_progress
+
+
+def test_record_request_updates_bound_children() -> None:
+    """Test record_request counts by status class and observes duration."""
+    labels = {"method": "GET", "endpoint": "/test-record/{id}"}
+
+    record_request("GET", "/test-record/{id}", "2xx", 0.02)
+    record_request("GET", "/test-record/{id}", "5xx", 0.3)
+    record_request("GET", "/test-record/{id}", "2xx", 0.01)
+
+    total = "atlas_api_http_requests_total"
+    assert REGISTRY.get_sample_value(total, {**labels, "status": "2xx"}) == 2
+    assert REGISTRY.get_sample_value(total, {**labels, "status": "5xx"}) == 1
+    assert REGISTRY.get_sample_value(total, {**labels, "status": "4xx"}) == 0
+    duration = "atlas_api_http_request_duration_seconds_count"
+    assert REGISTRY.get_sample_value(duration, labels) == 3
+
+
+def test_record_request_resolves_labels_once_per_endpoint() -> None:
+    """Test label children are resolved on first use, not on every request."""
+    from atlas_api.instrumentation import metrics
+
+    with (
+        patch.object(
+            metrics.http_requests_total, "labels", wraps=metrics.http_requests_total.labels
+        ) as total_labels,
+        patch.object(
+            metrics.http_request_duration_seconds,
+            "labels",
+            wraps=metrics.http_request_duration_seconds.labels,
+        ) as duration_labels,
+    ):
+        for status in ("2xx", "4xx", "2xx", "5xx", "2xx"):
+            record_request("POST", "/test-label-once/{id}", status, 0.01)
+
+    # One child per status class, bound together on the first request
+    assert total_labels.call_count == len(metrics.STATUS_CLASSES)
+    assert duration_labels.call_count == 1
+
+
+def test_bind_retry_counters_clamps_attempt_label() -> None:
+    """Test attempts past the label limit share a single overflow series."""
+    name = "atlas_api_retry_attempts_total"
+    operation = "test_bind_retry_counters.op"
+
+    counters = bind_retry_counters(operation, 15)
+    assert len(counters) == 15
+    assert counters[10] is counters[14]
+
+    for attempt in (0, 9, 10, 11, 14):
+        counters[attempt].inc()
+
+    assert REGISTRY.get_sample_value(name, {"operation": operation, "attempt": "1"}) == 1
+    assert REGISTRY.get_sample_value(name, {"operation": operation, "attempt": "10"}) == 1
+    assert REGISTRY.get_sample_value(name, {"operation": operation, "attempt": "10+"}) == 3
+    assert REGISTRY.get_sample_value(name, {"operation": operation, "attempt": "11"}) is None
@@ -6,24 +6,30 @@ Implements DDIA Chapter 1 principles for testing middleware.
 """
 
 import asyncio
+import logging
+from typing import AsyncIterator, Iterator
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from starlette.testclient import TestClient
 
+from atlas_api.middleware.compression import SelectiveGZipMiddleware
 from atlas_api.middleware.reliability import (
     ErrorHandlingMiddleware,
+    FusedReliabilityMiddleware,
     LoadSheddingMiddleware,
+    MetricsEndpointMiddleware,
     MetricsMiddleware,
     RequestIDMiddleware,
     TimeoutMiddleware,
+    request_id_var,
 )
 
 
-@pytest.fixture
-def app_with_middleware() -> FastAPI:
+def build_app_with_middleware() -> FastAPI:
     """Create FastAPI app with reliability middleware."""
     app = FastAPI()
 
@@ -39,10 +45,15 @@ def app_with_middleware() -> FastAPI:
         """Successful endpoint."""
         return {"status": "ok"}
 
+    @app.get("/request-id")
+    async def request_id_endpoint() -> dict[str, str | None]:
+        """Endpoint that reports the request ID from the context variable."""
+        return {"request_id": request_id_var.get()}
+
     @app.get("/slow")
     async def slow_endpoint() -> dict[str, str]:
         """Slow endpoint that times out."""
-        await asyncio.sleep(10)
+        await asyncio.sleep(0.05)
         return {"status": "ok"}
 
     @app.get("/error")
@@ -53,21 +64,34 @@ def app_with_middleware() -> FastAPI:
     return app
 
 
+@pytest.fixture(scope="module")
+def client() -> Iterator[TestClient]:
+    """Share one client for the reliability middleware app across this module."""
+    with TestClient(build_app_with_middleware()) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+async def aclient() -> AsyncIterator[httpx.AsyncClient]:
+    """Async client for the reliability middleware app, served in-loop without a thread."""
+    transport = httpx.ASGITransport(app=build_app_with_middleware())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
 class TestRequestIDMiddleware:
     """Tests for request ID middleware."""
 
-    def test_request_id_generated(self, app_with_middleware: FastAPI) -> None:
+    def test_request_id_generated(self, client: TestClient) -> None:
         """Test request ID is generated if not provided."""
-        client = TestClient(app_with_middleware)
         response = client.get("/success")
 
         assert response.status_code == 200
         assert "X-Request-ID" in response.headers
         assert len(response.headers["X-Request-ID"]) > 0
 
-    def test_request_id_preserved(self, app_with_middleware: FastAPI) -> None:
+    def test_request_id_preserved(self, client: TestClient) -> None:
         """Test provided request ID is preserved."""
-        client = TestClient(app_with_middleware)
         test_id = "test-request-123"
 
         response = client.get("/success", headers={"X-Request-ID": test_id})
@@ -75,17 +99,45 @@ class TestRequestIDMiddleware:
         assert response.status_code == 200
         assert response.headers["X-Request-ID"] == test_id
 
+    def test_request_id_unique_hex(self, client: TestClient) -> None:
+        """Test generated request IDs are unique 128-bit hex strings."""
+        ids = {client.get("/success").headers["X-Request-ID"] for _ in range(5)}
+
+        assert len(ids) == 5
+        for request_id in ids:
+            assert len(request_id) == 32
+            int(request_id, 16)
+
+    def test_request_id_bound_to_context_var(self, client: TestClient) -> None:
+        """Test handlers see the request ID through request_id_var."""
+        response = client.get("/request-id", headers={"X-Request-ID": "test-request-123"})
+
+        assert response.json() == {"request_id": "test-request-123"}
+        assert request_id_var.get() is None
+
+    @pytest.mark.asyncio
+    async def test_request_id_isolated_across_concurrent_requests(
+        self, aclient: httpx.AsyncClient
+    ) -> None:
+        """Test concurrent requests on one loop each see only their own request ID."""
+        ids = [f"concurrent-{i}" for i in range(10)]
+
+        responses = await asyncio.gather(
+            *(aclient.get("/request-id", headers={"X-Request-ID": i}) for i in ids)
+        )
+
+        assert [r.json()["request_id"] for r in responses] == ids
+        assert [r.headers["X-Request-ID"] for r in responses] == ids
+
 
 class TestTimeoutMiddleware:
     """Tests for timeout middleware."""
 
-    def test_request_timeout_returns_504(self, app_with_middleware: FastAPI) -> None:
+    def test_request_timeout_returns_504(self, client: TestClient) -> None:
         """Test timeout returns 504 Gateway Timeout."""
-        client = TestClient(app_with_middleware)
-
         # Patch settings to use very short timeout
         with patch("atlas_api.middleware.reliability.settings") as mock_settings:
-            mock_settings.http_timeout = 0.1
+            mock_settings.http_timeout = 0.005
             mock_settings.is_production = False
 
             response = client.get("/slow")
@@ -93,9 +145,8 @@ class TestTimeoutMiddleware:
             assert response.status_code == 504
             assert "timeout" in response.json()["message"].lower()
 
-    def test_successful_request_completes(self, app_with_middleware: FastAPI) -> None:
+    def test_successful_request_completes(self, client: TestClient) -> None:
         """Test successful request completes within timeout."""
-        client = TestClient(app_with_middleware)
         response = client.get("/success")
 
         assert response.status_code == 200
@@ -105,63 +156,177 @@ class TestTimeoutMiddleware:
 class TestMetricsMiddleware:
     """Tests for metrics middleware."""
 
-    def test_metrics_collected_on_success(self, app_with_middleware: FastAPI) -> None:
+    @pytest.fixture(autouse=True)
+    def mock_record(self, monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+        """Replace record_request for every test in this class."""
+        mock = MagicMock()
+        monkeypatch.setattr("atlas_api.middleware.reliability.record_request", mock)
+        return mock
+
+    def test_metrics_collected_on_success(self, client: TestClient, mock_record: MagicMock) -> None:
         """Test metrics are collected on successful request."""
-        client = TestClient(app_with_middleware)
+        response = client.get("/success")
 
-        with patch(
-            "atlas_api.middleware.reliability.http_requests_total"
-        ) as mock_counter:
-            with patch(
-                "atlas_api.middleware.reliability.http_request_duration_seconds"
-            ) as mock_histogram:
-                response = client.get("/success")
+        assert response.status_code == 200
+        # Verify metrics were recorded with the bucketed status class
+        mock_record.assert_called_once()
+        method, endpoint, status, duration = mock_record.call_args.args
+        assert (method, endpoint, status) == ("GET", "/success", "2xx")
+        assert duration >= 0
+
+    def test_endpoint_label_uses_route_template(self, mock_record: MagicMock) -> None:
+        """Test endpoint label is the route template, never the raw path."""
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
 
-                assert response.status_code == 200
-                # Verify metrics were recorded
-                assert mock_counter.labels.called
-                assert mock_histogram.labels.called
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: int) -> dict[str, int]:
+            return {"item_id": item_id}
 
-    def test_path_normalization(self) -> None:
+        client = TestClient(app)
+
+        client.get("/items/123")
+        client.get("/items/456")
+        client.get("/does-not-exist/789")
+
+        endpoints = [call.args[1] for call in mock_record.call_args_list]
+        assert endpoints == ["/items/{item_id}", "/items/{item_id}", "unmatched"]
+        assert not any(char.isdigit() for endpoint in endpoints for char in endpoint)
+
+    def test_status_class_buckets(self) -> None:
+        """Test status codes are bucketed into bounded status classes."""
+        from atlas_api.instrumentation.metrics import status_class
+
+        assert status_class(200) == "2xx"
+        assert status_class(204) == "2xx"
+        assert status_class(307) == "3xx"
+        assert status_class(404) == "4xx"
+        assert status_class(503) == "5xx"
+        assert status_class(999) == "error"
+
+    @pytest.mark.parametrize(
+        ("path", "expected"),
+        [
+            # UUIDs, in any case
+            ("/api/v1/users/550e8400-e29b-41d4-a716-446655440000", "/api/v1/users/{id}"),
+            ("/files/ABCDEFAB-ABCD-ABCD-ABCD-ABCDEFABCDEF", "/files/{id}"),
+            # Numeric IDs
+            ("/api/v1/users/123/posts/456", "/api/v1/users/{id}/posts/{id}"),
+            # Trailing slash removal
+            ("/api/v1/users/", "/api/v1/users"),
+            # Static paths pass through, including the root
+            ("/healthz/", "/healthz"),
+            ("/v2-beta/items", "/v2-beta/items"),
+            ("/", "/"),
+        ],
+    )
+    def test_path_normalization(self, path: str, expected: str) -> None:
         """Test path normalization for metrics."""
         from atlas_api.middleware.reliability import MetricsMiddleware
 
-        # Test UUID normalization
-        path = "/api/v1/users/550e8400-e29b-41d4-a716-446655440000"
-        normalized = MetricsMiddleware._normalize_path(path)
-        assert "{id}" in normalized
-        assert "550e8400" not in normalized
+        assert MetricsMiddleware._normalize_path(path) == expected
+
+    def test_path_normalization_memoized(self) -> None:
+        """Test a repeated raw path is served from the cache without regex work."""
+        from atlas_api.middleware.reliability import _normalize_path
+
+        path = "/api/v1/memo-check/987654"
+        before = _normalize_path.cache_info()
+
+        assert _normalize_path(path) == "/api/v1/memo-check/{id}"
+        assert _normalize_path(path) == "/api/v1/memo-check/{id}"
 
-        # Test numeric ID normalization
-        path = "/api/v1/users/123/posts/456"
-        normalized = MetricsMiddleware._normalize_path(path)
-        assert normalized == "/api/v1/users/{id}/posts/{id}"
+        after = _normalize_path.cache_info()
+        assert after.misses - before.misses == 1
+        assert after.hits - before.hits == 1
 
-        # Test trailing slash removal
-        path = "/api/v1/users/"
-        normalized = MetricsMiddleware._normalize_path(path)
-        assert normalized == "/api/v1/users"
+
+class TestMetricsEndpointMiddleware:
+    """Tests for metrics endpoint middleware."""
+
+    def test_scrape_bypasses_other_middleware(self) -> None:
+        """Test /metrics is served without running the rest of the stack."""
+        # Adds middleware, so it needs its own app rather than the shared client
+        app = build_app_with_middleware()
+        app.add_middleware(MetricsEndpointMiddleware, metrics_app=PlainTextResponse("metrics"))
+        client = TestClient(app)
+
+        with patch("atlas_api.middleware.reliability.record_request") as mock_record:
+            for path in ("/metrics", "/metrics/"):
+                response = client.get(path, follow_redirects=False)
+
+                assert response.status_code == 200
+                assert response.text == "metrics"
+                assert "X-Request-ID" not in response.headers
+
+            response = client.get("/success")
+
+        assert response.headers["X-Request-ID"]
+        # Only the non-scrape request is counted
+        assert mock_record.call_count == 1
+
+
+class TestSelectiveGZipMiddleware:
+    """Tests for selective GZip middleware."""
+
+    def test_excluded_prefixes_not_compressed(self) -> None:
+        """Test health responses skip compression while other routes compress."""
+        app = FastAPI()
+        app.add_middleware(SelectiveGZipMiddleware, minimum_size=10)
+        payload = {"data": "x" * 2000}
+
+        @app.get("/health/deep")
+        async def health_endpoint() -> dict[str, str]:
+            return payload
+
+        @app.get("/report")
+        async def report_endpoint() -> dict[str, str]:
+            return payload
+
+        client = TestClient(app)
+        headers = {"Accept-Encoding": "gzip"}
+
+        assert "content-encoding" not in client.get("/health/deep", headers=headers).headers
+        assert client.get("/report", headers=headers).headers["content-encoding"] == "gzip"
 
 
 class TestErrorHandlingMiddleware:
     """Tests for error handling middleware."""
 
-    def test_error_returns_500(self, app_with_middleware: FastAPI) -> None:
+    def test_error_returns_500(self, client: TestClient) -> None:
         """Test unhandled error returns 500."""
-        client = TestClient(app_with_middleware)
         response = client.get("/error")
 
         assert response.status_code == 500
         assert "error" in response.json()
 
-    def test_error_includes_request_id(self, app_with_middleware: FastAPI) -> None:
+    def test_error_includes_request_id(self, client: TestClient) -> None:
         """Test error response includes request ID."""
-        client = TestClient(app_with_middleware)
         response = client.get("/error")
 
         assert response.status_code == 500
         assert "request_id" in response.json()
 
+    def test_error_log_copies_query_params_only_at_debug(
+        self, client: TestClient, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        """Test query params are logged with the error only when DEBUG is enabled."""
+        logger_name = "atlas_api.middleware.reliability"
+
+        def error_record() -> logging.LogRecord:
+            return next(r for r in caplog.records if r.getMessage().startswith("Unhandled"))
+
+        with caplog.at_level(logging.INFO, logger=logger_name):
+            client.get("/error?page=2")
+        record = error_record()
+        assert record.path == "/error"
+        assert not hasattr(record, "query_params")
+
+        caplog.clear()
+        with caplog.at_level(logging.DEBUG, logger=logger_name):
+            client.get("/error?page=2")
+        assert error_record().query_params == {"page": "2"}
+
 
 class TestLoadSheddingMiddleware:
     """Tests for load shedding middleware."""
@@ -196,32 +361,195 @@ class TestLoadSheddingMiddleware:
             return {"status": "ok"}
 
         client = TestClient(app)
-        # First request will increment current_requests to 1, which exceeds max of 0
+        # No permits are available, so every request is shed
         response = client.get("/test")
 
         assert response.status_code == 429
         assert "Too Many Requests" in response.json()["error"]
 
+    def test_load_shedding_never_sheds_health_probes(self) -> None:
+        """Test bypass paths are admitted even with no permits available."""
+        app = FastAPI()
+        app.add_middleware(LoadSheddingMiddleware, max_concurrent_requests=0)
+
+        @app.get("/health/live")
+        async def live_endpoint() -> dict[str, str]:
+            return {"status": "alive"}
+
+        client = TestClient(app)
+
+        assert client.get("/health/live").status_code == 200
+
+    @pytest.mark.parametrize(("api_workers", "expected"), [(1, 4000), (4, 1000), (8, 500)])
+    def test_load_shedding_limit_split_across_workers(
+        self, api_workers: int, expected: int
+    ) -> None:
+        """Test the configured total is divided by the worker count, not a fixed default."""
+        from atlas_api.config import get_settings
+
+        settings = get_settings().model_copy(
+            update={"max_concurrent_requests": 4000, "api_workers": api_workers}
+        )
+
+        assert settings.max_concurrent_requests_per_worker == expected
+
+    @pytest.mark.asyncio
+    async def test_load_shedding_admits_up_to_limit(self) -> None:
+        """Test concurrent requests beyond the limit are shed, then admitted again."""
+        app = FastAPI()
+        app.add_middleware(LoadSheddingMiddleware, max_concurrent_requests=1)
+        release = asyncio.Event()
+
+        @app.get("/wait")
+        async def wait_endpoint() -> dict[str, str]:
+            await release.wait()
+            return {"status": "ok"}
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/wait"))
+            await asyncio.sleep(0.05)
+
+            shed = await client.get("/wait")
+            release.set()
+
+            assert shed.status_code == 429
+            assert (await first).status_code == 200
+            assert (await client.get("/wait")).status_code == 200
+
+
+class TestFusedReliabilityMiddleware:
+    """Tests for the fused reliability middleware."""
+
+    @pytest.fixture(scope="class")
+    def client(self) -> Iterator[TestClient]:
+        """Share one client for an app with only the fused middleware."""
+        app = FastAPI()
+        app.add_middleware(FusedReliabilityMiddleware, max_concurrent_requests=10)
+
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: int, request: Request) -> dict[str, str]:
+            return {"request_id": request.state.request_id}
+
+        @app.get("/slow")
+        async def slow_endpoint() -> dict[str, str]:
+            await asyncio.sleep(0.05)
+            return {"status": "ok"}
+
+        @app.get("/error")
+        async def error_endpoint() -> None:
+            raise ValueError("Test error")
+
+        with TestClient(app) as test_client:
+            yield test_client
+
+    def test_request_id_generated_and_preserved(self, client: TestClient) -> None:
+        """Test request ID is generated, exposed on request.state and echoed."""
+        response = client.get("/items/1")
+        request_id = response.headers["X-Request-ID"]
+        assert len(request_id) == 32
+        assert response.json() == {"request_id": request_id}
+
+        response = client.get("/items/1", headers={"X-Request-ID": "test-request-123"})
+        assert response.headers["X-Request-ID"] == "test-request-123"
+
+    def test_bypass_paths_skip_reliability_bookkeeping(self) -> None:
+        """Test health probes are not counted, tagged or shed."""
+        app = FastAPI()
+        app.add_middleware(FusedReliabilityMiddleware, max_concurrent_requests=0)
+
+        @app.get("/health")
+        async def health_endpoint() -> dict[str, str]:
+            return {"status": "healthy"}
+
+        client = TestClient(app)
+        with patch("atlas_api.middleware.reliability.record_request") as mock_record:
+            response = client.get("/health")
+
+        assert response.status_code == 200
+        assert "X-Request-ID" not in response.headers
+        mock_record.assert_not_called()
+
+    def test_metrics_recorded_once_per_request(self, client: TestClient) -> None:
+        """Test one metrics record per request, labeled by route template."""
+        with patch("atlas_api.middleware.reliability.record_request") as mock_record:
+            client.get("/items/42")
+
+        mock_record.assert_called_once()
+        method, endpoint, status, _ = mock_record.call_args.args
+        assert (method, endpoint, status) == ("GET", "/items/{item_id}", "2xx")
+
+    @pytest.mark.asyncio
+    async def test_metrics_recorded_after_response_sent(self) -> None:
+        """Test metrics are recorded only once the response has gone to the server."""
+        events: list[str] = []
+
+        async def app(scope: dict, receive: object, send: object) -> None:
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        async def send(message: dict) -> None:
+            events.append(message["type"])
+
+        async def receive() -> dict:
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        middleware = FusedReliabilityMiddleware(app, max_concurrent_requests=10)
+        scope = {"type": "http", "method": "GET", "path": "/items/1", "headers": []}
+        with patch(
+            "atlas_api.middleware.reliability.record_request",
+            side_effect=lambda *args: events.append("metrics"),
+        ):
+            await middleware(scope, receive, send)
+
+        assert events == ["http.response.start", "http.response.body", "metrics"]
+
+    def test_timeout_returns_504(self, client: TestClient) -> None:
+        """Test timeout returns 504 with the request ID."""
+        with patch("atlas_api.middleware.reliability.settings") as mock_settings:
+            mock_settings.http_timeout = 0.005
+            response = client.get("/slow")
+
+        assert response.status_code == 504
+        assert response.json()["request_id"] == response.headers["X-Request-ID"]
+
+    def test_error_returns_500(self, client: TestClient) -> None:
+        """Test unhandled error returns 500 with the request ID."""
+        with patch("atlas_api.middleware.reliability.record_request") as mock_record:
+            response = client.get("/error")
+
+        assert response.status_code == 500
+        assert response.json()["request_id"] == response.headers["X-Request-ID"]
+        assert mock_record.call_args.args[2] == "5xx"
+
+    def test_load_shedding_returns_429(self) -> None:
+        """Test requests are shed with 429 when no capacity is left."""
+        app = FastAPI()
+        app.add_middleware(FusedReliabilityMiddleware, max_concurrent_requests=0)
+
+        @app.get("/test")
+        async def test_endpoint() -> dict[str, str]:
+            return {"status": "ok"}
+
+        response = TestClient(app).get("/test")
+
+        assert response.status_code == 429
+        assert "X-Request-ID" in response.headers
+
 
 class TestMiddlewareIntegration:
     """Integration tests for middleware stack."""
 
-    def test_middleware_order_preserved(self, app_with_middleware: FastAPI) -> None:
+    def test_middleware_order_preserved(self, client: TestClient) -> None:
         """Test middleware processes requests in correct order."""
-        client = TestClient(app_with_middleware)
-
         # Request should pass through all middleware
         response = client.get("/success")
 
         assert response.status_code == 200
         assert "X-Request-ID" in response.headers
 
-    def test_error_propagates_through_middleware(
-        self, app_with_middleware: FastAPI
-    ) -> None:
+    def test_error_propagates_through_middleware(self, client: TestClient) -> None:
         """Test errors propagate through middleware stack."""
-        client = TestClient(app_with_middleware)
-
         response = client.get("/error")
 
         # Should be caught by error handling middleware
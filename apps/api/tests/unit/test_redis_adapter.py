@@ -0,0 +1,62 @@
+"""
+Unit tests for the Redis adapter.
+
+Tests that batched writes go through the adapter's circuit breaker.
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from redis.exceptions import RedisError
+
+from atlas_api.adapters.redis import RedisAdapter
+from atlas_api.config import get_frozen_settings
+
+
+def make_adapter() -> tuple[RedisAdapter, MagicMock]:
+    """
+    Build an adapter whose client hands out a mocked pipeline.
+
+    Returns:
+        tuple[RedisAdapter, MagicMock]: Adapter and the pipeline it will use
+    """
+    adapter = RedisAdapter(get_frozen_settings())
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[True])
+    adapter._client = MagicMock()
+    adapter._client.pipeline.return_value.__aenter__.return_value = pipe
+    return adapter, pipe
+
+
+@pytest.mark.asyncio
+async def test_mset_short_circuits_when_circuit_open() -> None:
+    """
+    Test that an open circuit rejects mset without touching Redis.
+
+    Scenario: The Redis circuit breaker is OPEN
+    Expected: mset returns False and the pipeline is never executed
+    """
+    adapter, pipe = make_adapter()
+    adapter._breaker._trip()
+
+    assert await adapter.mset({"a": "1", "b": "2"}, ex=60) is False
+    pipe.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_mset_failures_count_toward_circuit() -> None:
+    """
+    Test that a failed batched write is recorded by the circuit breaker.
+
+    Scenario: Executing the pipeline raises RedisError
+    Expected: mset returns False and the breaker counts one failure
+    """
+    adapter, pipe = make_adapter()
+    pipe.execute.side_effect = RedisError("connection reset")
+
+    assert await adapter.mset({"a": "1"}) is False
+    assert adapter._breaker.failure_count == 1
+
+    pipe.execute.side_effect = None
+    assert await adapter.mset({"a": "1"}) is True
+    assert adapter._breaker.failure_count == 0
@@ -6,22 +6,32 @@ Implements DDIA Chapter 1 principles for testing reliability patterns.
 """
 
 import asyncio
+import dataclasses
 import time
+from typing import Any, Callable
 from unittest.mock import MagicMock, patch
 
 import pytest
+from prometheus_client import REGISTRY
 
 from atlas_api.reliability import (
     ATLAS_API_SLO,
     CRITICAL_ENDPOINT_SLO,
+    NON_CRITICAL_ENDPOINT_SLO,
     CircuitBreaker,
     CircuitBreakerConfig,
+    CircuitOpenError,
     CircuitState,
+    ErrorBudgetTracker,
     ErrorRateSLI,
+    LatencyHistogram,
     LatencySLI,
     RetryConfig,
     ThroughputSLI,
+    format_slo_summary,
+    get_latency_histogram,
     get_slo_for_endpoint,
+    record_latency_us,
     retry_async,
     retry_sync,
 )
@@ -30,36 +40,38 @@ from atlas_api.reliability import (
 class TestSLO:
     """Tests for SLI/SLO definitions."""
 
-    def test_latency_sli_valid(self) -> None:
-        """Test valid latency SLI creation."""
-        sli = LatencySLI(p50_ms=50, p95_ms=200, p99_ms=500, p999_ms=1000)
-        assert sli.p50_ms == 50
-        assert sli.p95_ms == 200
-
-    def test_latency_sli_invalid_order(self) -> None:
-        """Test latency SLI rejects invalid percentile order."""
-        with pytest.raises(ValueError):
-            LatencySLI(p50_ms=500, p95_ms=200, p99_ms=100, p999_ms=50)
-
-    def test_error_rate_sli_valid(self) -> None:
-        """Test valid error rate SLI creation."""
-        sli = ErrorRateSLI(max_error_rate=0.01, max_5xx_rate=0.001)
-        assert sli.max_error_rate == 0.01
-
-    def test_error_rate_sli_invalid_range(self) -> None:
-        """Test error rate SLI rejects invalid ranges."""
-        with pytest.raises(ValueError):
-            ErrorRateSLI(max_error_rate=1.5, max_5xx_rate=0.001)
-
-    def test_throughput_sli_valid(self) -> None:
-        """Test valid throughput SLI creation."""
-        sli = ThroughputSLI(min_rps=100, max_rps=10000)
-        assert sli.min_rps == 100
+    @pytest.mark.parametrize(
+        ("sli_class", "kwargs", "valid"),
+        [
+            (LatencySLI, {"p50_ms": 50, "p95_ms": 200, "p99_ms": 500, "p999_ms": 1000}, True),
+            # Percentiles out of order
+            (LatencySLI, {"p50_ms": 500, "p95_ms": 200, "p99_ms": 100, "p999_ms": 50}, False),
+            (ErrorRateSLI, {"max_error_rate": 0.01, "max_5xx_rate": 0.001}, True),
+            # Rate outside [0, 1]
+            (ErrorRateSLI, {"max_error_rate": 1.5, "max_5xx_rate": 0.001}, False),
+            (ThroughputSLI, {"min_rps": 100, "max_rps": 10000}, True),
+            # Minimum above maximum
+            (ThroughputSLI, {"min_rps": 10000, "max_rps": 100}, False),
+        ],
+        ids=[
+            "latency-valid",
+            "latency-invalid-order",
+            "error-rate-valid",
+            "error-rate-invalid-range",
+            "throughput-valid",
+            "throughput-invalid-order",
+        ],
+    )
+    def test_sli_validation(self, sli_class: type, kwargs: dict[str, float], valid: bool) -> None:
+        """Test SLIs accept valid values and reject invalid ones."""
+        if not valid:
+            with pytest.raises(ValueError):
+                sli_class(**kwargs)
+            return
 
-    def test_throughput_sli_invalid_order(self) -> None:
-        """Test throughput SLI rejects invalid order."""
-        with pytest.raises(ValueError):
-            ThroughputSLI(min_rps=10000, max_rps=100)
+        sli = sli_class(**kwargs)
+        for field, value in kwargs.items():
+            assert getattr(sli, field) == value
 
     def test_atlas_api_slo_defaults(self) -> None:
         """Test default Atlas API SLO."""
@@ -67,6 +79,16 @@ class TestSLO:
         assert ATLAS_API_SLO.latency.p95_ms == 200.0
         assert ATLAS_API_SLO.error_rate.max_error_rate == 0.01
 
+    def test_slo_is_immutable_and_summary_memoized(self) -> None:
+        """Test SLOs cannot be mutated and their summary is formatted once."""
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            ATLAS_API_SLO.window_minutes = 10  # type: ignore[misc]
+
+        summary = format_slo_summary(ATLAS_API_SLO)
+        assert "SLO: atlas-api" in summary
+        assert "Max Error Rate: 1.00%" in summary
+        assert format_slo_summary(ATLAS_API_SLO) is summary
+
     def test_get_slo_for_critical_endpoint(self) -> None:
         """Test SLO selection for critical endpoints."""
         slo = get_slo_for_endpoint("/auth/login")
@@ -78,6 +100,96 @@ class TestSLO:
         slo = get_slo_for_endpoint("/api/v1/users")
         assert slo == ATLAS_API_SLO
 
+    def test_get_slo_matches_whole_segments(self) -> None:
+        """Test SLO selection matches path segments, with critical taking precedence."""
+        assert get_slo_for_endpoint("/api/v1/payments/{id}") is CRITICAL_ENDPOINT_SLO
+        assert get_slo_for_endpoint("/health/deep") is CRITICAL_ENDPOINT_SLO
+        assert get_slo_for_endpoint("/api/v1/reports/export") is NON_CRITICAL_ENDPOINT_SLO
+        assert get_slo_for_endpoint("/api/v1/reports/auth") is CRITICAL_ENDPOINT_SLO
+        assert get_slo_for_endpoint("/api/v1/authors") is ATLAS_API_SLO
+
+
+class TestLatencyHistogram:
+    """Test bounded-memory latency histogram."""
+
+    def test_percentiles_within_precision(self) -> None:
+        """Test percentiles stay within the configured relative error."""
+        histogram = LatencyHistogram(significant_digits=3)
+        for value_us in range(1, 100_001):
+            histogram.record(value_us)
+
+        assert histogram.total_count == 100_000
+        for percentile in (50.0, 99.0, 99.9):
+            exact = percentile / 100 * 100_000
+            assert abs(histogram.value_at_percentile(percentile) - exact) / exact < 0.001
+
+    def test_clamps_out_of_range_values(self) -> None:
+        """Test values outside the trackable range are clamped."""
+        histogram = LatencyHistogram(max_value_us=1_000)
+        histogram.record(-5)
+        histogram.record(5_000)
+
+        assert histogram.value_at_percentile(0.0) == 0
+        assert histogram.value_at_percentile(100.0) == 1_000
+
+    def test_merge_combines_counts(self) -> None:
+        """Test merged histograms answer as if all values were recorded once."""
+        first, second = LatencyHistogram(), LatencyHistogram()
+        for value_us in range(1, 501):
+            first.record(value_us)
+            second.record(value_us + 500)
+
+        first.merge(second)
+
+        assert first.total_count == 1_000
+        assert first.value_at_percentile(50.0) == 500
+        with pytest.raises(ValueError):
+            first.merge(LatencyHistogram(significant_digits=2))
+
+    def test_record_latency_per_slo(self) -> None:
+        """Test latencies are tracked in one histogram per SLO."""
+        histogram = get_latency_histogram(CRITICAL_ENDPOINT_SLO)
+        histogram.reset()
+
+        record_latency_us(CRITICAL_ENDPOINT_SLO, 15_000)
+
+        assert get_latency_histogram(CRITICAL_ENDPOINT_SLO) is histogram
+        assert histogram.total_count == 1
+        assert histogram.value_at_percentile(99.9) <= CRITICAL_ENDPOINT_SLO.latency.p50_ms * 1000
+
+
+class TestErrorBudgetTracker:
+    """Test rolling SLO evaluation."""
+
+    def test_error_rate_and_budget(self) -> None:
+        """Test error rate and budget over requests in the window."""
+        # 5-minute window in 60 buckets of 5 seconds
+        tracker = ErrorBudgetTracker(ATLAS_API_SLO, clock=lambda: 0.0)
+        for i in range(1_000):
+            tracker.record(is_error=i < 5, latency_ms=10.0 if i < 990 else 400.0)
+
+        assert tracker.request_count() == 1_000
+        assert tracker.error_rate() == pytest.approx(0.005)
+        assert tracker.error_budget_remaining() == pytest.approx(0.5)
+        assert tracker.p99_ms() == pytest.approx(10.0, rel=0.01)
+        assert tracker.latency_percentile_ms(99.9) == pytest.approx(400.0, rel=0.01)
+
+    def test_samples_expire_after_window(self) -> None:
+        """Test samples stop counting once their bucket leaves the window."""
+        tracker = ErrorBudgetTracker(ATLAS_API_SLO)
+        tracker.record(is_error=True, latency_ms=900.0, now=0.0)
+        tracker.record(is_error=False, latency_ms=20.0, now=150.0)
+
+        assert tracker.error_rate(now=299.0) == pytest.approx(0.5)
+
+        # First bucket covered [0, 5); it leaves the 300s window at t=300
+        assert tracker.error_rate(now=300.0) == 0.0
+        assert tracker.request_count(now=300.0) == 1
+        assert tracker.p99_ms(now=300.0) == pytest.approx(20.0, rel=0.01)
+
+        assert tracker.request_count(now=1_000.0) == 0
+        assert tracker.p99_ms(now=1_000.0) == 0.0
+
 
 class TestRetryConfig:
     """Tests for retry configuration."""
@@ -103,14 +215,9 @@ class TestRetryConfig:
             jitter=False,
         )
 
-        # Attempt 0: 100ms
-        assert config.calculate_delay_ms(0) == 100
-        # Attempt 1: 200ms
-        assert config.calculate_delay_ms(1) == 200
-        # Attempt 2: 400ms
-        assert config.calculate_delay_ms(2) == 400
-        # Attempt 3: 800ms
-        assert config.calculate_delay_ms(3) == 800
+        # Doubles from 100ms each attempt
+        assert [config.calculate_delay_ms(i) for i in range(5)] == [100, 200, 400, 800, 1600]
+        assert config.schedule() == [100, 200, 400, 800, 1600]
 
     def test_calculate_delay_with_max_cap(self) -> None:
         """Test delay is capped at max_delay_ms."""
@@ -122,8 +229,9 @@ class TestRetryConfig:
             jitter=False,
         )
 
-        # Attempt 4: would be 1600ms, but capped at 1000ms
-        assert config.calculate_delay_ms(4) == 1000
+        # Attempt 4 would be 1600ms, but is capped at 1000ms
+        assert [config.calculate_delay_ms(i) for i in range(5)] == [100, 200, 400, 800, 1000]
+        assert config.schedule() == [100, 200, 400, 800, 1000]
 
     def test_calculate_delay_with_jitter(self) -> None:
         """Test jitter adds randomness to delays."""
@@ -214,6 +322,23 @@ class TestRetrySyncDecorator:
         assert call_count == 1
 
 
+    def test_retry_sync_labels_attempts_by_function_name(self) -> None:
+        """Test retry counters use the function's __name__, not its qualified name."""
+
+        @retry_sync(
+            config=RetryConfig(max_attempts=2, base_delay_ms=0, jitter=False),
+            exceptions=(ValueError,),
+        )
+        def retry_label_probe() -> None:
+            raise ValueError("always")
+
+        with pytest.raises(ValueError):
+            retry_label_probe()
+
+        labels = {"operation": "retry_label_probe", "attempt": "1"}
+        assert REGISTRY.get_sample_value("atlas_api_retry_attempts_total", labels) == 1
+
+
 class TestRetryAsyncDecorator:
     """Tests for async retry decorator."""
 
@@ -253,18 +378,45 @@ class TestRetryAsyncDecorator:
         assert call_count == 3
 
 
+BreakerFactory = Callable[..., CircuitBreaker]
+
+
+@pytest.fixture(scope="module")
+def make_cb() -> BreakerFactory:
+    """
+    Hand out "test-service" circuit breakers, reusing one per configuration.
+
+    A reused breaker is reset first, so each test starts from CLOSED without
+    paying for construction and metric label binding again.
+    """
+    breakers: dict[tuple[tuple[str, Any], ...], CircuitBreaker] = {}
+
+    def make(**config: Any) -> CircuitBreaker:
+        key = tuple(sorted(config.items()))
+        cb = breakers.get(key)
+        if cb is None:
+            cb = breakers[key] = CircuitBreaker(
+                "test-service", config=CircuitBreakerConfig(**config)
+            )
+        else:
+            cb.reset()
+        return cb
+
+    return make
+
+
 class TestCircuitBreaker:
     """Tests for circuit breaker pattern."""
 
-    def test_circuit_breaker_initial_state(self) -> None:
+    def test_circuit_breaker_initial_state(self, make_cb: BreakerFactory) -> None:
         """Test circuit breaker starts in CLOSED state."""
-        cb = CircuitBreaker("test-service")
+        cb = make_cb()
         assert cb.state == CircuitState.CLOSED
         assert cb.failure_count == 0
 
-    def test_circuit_breaker_success_in_closed_state(self) -> None:
+    def test_circuit_breaker_success_in_closed_state(self, make_cb: BreakerFactory) -> None:
         """Test circuit breaker allows calls in CLOSED state."""
-        cb = CircuitBreaker("test-service")
+        cb = make_cb()
 
         def successful_call() -> str:
             return "success"
@@ -273,10 +425,9 @@ class TestCircuitBreaker:
         assert result == "success"
         assert cb.state == CircuitState.CLOSED
 
-    def test_circuit_breaker_opens_after_threshold(self) -> None:
+    def test_circuit_breaker_opens_after_threshold(self, make_cb: BreakerFactory) -> None:
         """Test circuit breaker opens after failure threshold."""
-        config = CircuitBreakerConfig(failure_threshold=3)
-        cb = CircuitBreaker("test-service", config=config)
+        cb = make_cb(failure_threshold=3)
 
         def failing_call() -> None:
             raise ValueError("Service error")
@@ -293,14 +444,9 @@ class TestCircuitBreaker:
         with pytest.raises(Exception, match="Circuit breaker.*OPEN"):
             cb.call_sync(failing_call)
 
-    def test_circuit_breaker_half_open_recovery(self) -> None:
+    def test_circuit_breaker_half_open_recovery(self, make_cb: BreakerFactory) -> None:
         """Test circuit breaker attempts recovery in HALF_OPEN state."""
-        config = CircuitBreakerConfig(
-            failure_threshold=2,
-            recovery_timeout_seconds=1,
-            success_threshold=2,
-        )
-        cb = CircuitBreaker("test-service", config=config)
+        cb = make_cb(failure_threshold=2, recovery_timeout_seconds=1, success_threshold=2)
 
         # Cause failures to open circuit
         def failing_call() -> None:
@@ -312,27 +458,40 @@ class TestCircuitBreaker:
 
         assert cb.state == CircuitState.OPEN
 
-        # Wait for recovery timeout
-        time.sleep(1.1)
-
         # Next call should transition to HALF_OPEN
         def successful_call() -> str:
             return "success"
 
-        # First success in HALF_OPEN
-        result = cb.call_sync(successful_call)
-        assert result == "success"
-        assert cb.state == CircuitState.HALF_OPEN
+        # Jump the monotonic clock past the recovery timeout instead of waiting
+        with patch("time.monotonic", return_value=time.monotonic() + 1.1):
+            # First success in HALF_OPEN
+            result = cb.call_sync(successful_call)
+            assert result == "success"
+            assert cb.state == CircuitState.HALF_OPEN
 
-        # Second success should close circuit
-        result = cb.call_sync(successful_call)
-        assert result == "success"
+            # Second success should close circuit
+            result = cb.call_sync(successful_call)
+            assert result == "success"
+            assert cb.state == CircuitState.CLOSED
+
+    def test_circuit_breaker_reset(self, make_cb: BreakerFactory) -> None:
+        """Test reset returns an open circuit to a clean CLOSED state."""
+        cb = make_cb(failure_threshold=1)
+
+        with pytest.raises(ValueError):
+            cb.call_sync(MagicMock(side_effect=ValueError("Service error")))
+        assert cb.state == CircuitState.OPEN
+
+        assert make_cb(failure_threshold=1) is cb
         assert cb.state == CircuitState.CLOSED
+        assert cb.failure_count == 0
+        assert cb.get_status()["opened_at"] is None
+        assert cb.call_sync(lambda: "success") == "success"
 
     @pytest.mark.asyncio
-    async def test_circuit_breaker_async(self) -> None:
+    async def test_circuit_breaker_async(self, make_cb: BreakerFactory) -> None:
         """Test circuit breaker with async functions."""
-        cb = CircuitBreaker("test-service")
+        cb = make_cb()
 
         async def successful_call() -> str:
             return "success"
@@ -340,12 +499,109 @@ class TestCircuitBreaker:
         result = await cb.call_async(successful_call)
         assert result == "success"
 
-    def test_circuit_breaker_get_status(self) -> None:
+    def test_circuit_breaker_get_status(self, make_cb: BreakerFactory) -> None:
         """Test circuit breaker status reporting."""
-        cb = CircuitBreaker("test-service")
+        cb = make_cb()
         status = cb.get_status()
 
         assert status["name"] == "test-service"
         assert status["state"] == "closed"
         assert status["failure_count"] == 0
 
+    def test_circuit_breaker_recovery_ignores_wall_clock(self, make_cb: BreakerFactory) -> None:
+        """Test recovery timing uses the monotonic clock, not wall-clock time."""
+        cb = make_cb(failure_threshold=1, recovery_timeout_seconds=60)
+
+        def failing_call() -> None:
+            raise ValueError("Service error")
+
+        with pytest.raises(ValueError):
+            cb.call_sync(failing_call)
+
+        # A wall-clock jump forward must not end the recovery timeout early
+        with patch("time.time", return_value=time.time() + 3600):
+            assert not cb._should_attempt_reset()
+
+        # Status still reports when the circuit opened as wall-clock time
+        assert abs(cb.get_status()["opened_at"] - time.time()) < 5
+
+    def test_circuit_breaker_exports_state_gauge(self) -> None:
+        """Test the state gauge and status report follow state transitions."""
+        config = CircuitBreakerConfig(failure_threshold=1)
+        cb = CircuitBreaker("test-gauge-service", config=config)
+        labels = {"service": "test-gauge-service"}
+
+        assert REGISTRY.get_sample_value("atlas_api_circuit_breaker_state", labels) == 0
+
+        with pytest.raises(ValueError):
+            cb.call_sync(MagicMock(side_effect=ValueError("Service error")))
+
+        assert REGISTRY.get_sample_value("atlas_api_circuit_breaker_state", labels) == 1
+        assert cb.get_status()["state"] == "open"
+
+    def test_circuit_breaker_reuses_open_error(self, make_cb: BreakerFactory) -> None:
+        """Test rejected calls raise one preallocated error without growing its traceback."""
+        cb = make_cb(failure_threshold=1)
+
+        def failing_call() -> None:
+            raise ValueError("Service error")
+
+        with pytest.raises(ValueError):
+            cb.call_sync(failing_call)
+
+        errors = []
+        for _ in range(3):
+            with pytest.raises(CircuitOpenError) as exc_info:
+                cb.call_sync(failing_call)
+            errors.append(exc_info.value)
+
+        assert errors[0] is errors[1] is errors[2]
+        assert "test-service is OPEN" in str(errors[0])
+
+        depth = 0
+        tb = errors[0].__traceback__
+        while tb is not None:
+            depth += 1
+            tb = tb.tb_next
+        assert depth <= 3
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_opens_once_under_concurrent_failures(
+        self, make_cb: BreakerFactory
+    ) -> None:
+        """Test in-flight failures after opening do not reopen the circuit."""
+        cb = make_cb(failure_threshold=2)
+
+        async def failing_call() -> None:
+            await asyncio.sleep(0.01)
+            raise ValueError("Service error")
+
+        with patch("atlas_api.reliability.circuit_breaker.logger") as logger:
+            results = await asyncio.gather(
+                *(cb.call_async(failing_call) for _ in range(5)), return_exceptions=True
+            )
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert cb.state == CircuitState.OPEN
+        assert cb.failure_count == 5
+        # Only the threshold-crossing failure transitioned the state
+        logger.error.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_opens_on_slow_calls(self, make_cb: BreakerFactory) -> None:
+        """Test circuit breaker opens when average latency exceeds the threshold."""
+        cb = make_cb(slow_call_threshold_ms=1, slow_call_window=3)
+
+        async def slow_call() -> str:
+            await asyncio.sleep(0.005)
+            return "success"
+
+        # Slow calls still succeed until the window fills
+        for _ in range(3):
+            assert await cb.call_async(slow_call) == "success"
+
+        assert cb.state == CircuitState.OPEN
+
+        # Open circuit rejects without calling the function
+        with pytest.raises(CircuitOpenError):
+            await cb.call_async(slow_call)